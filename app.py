@@ -4,10 +4,17 @@ from dash_bootstrap_templates import load_figure_template
 
 from components.graph import Graph
 from components.layout import serve_layout
+from services.compression import compress_responses
+from services.data_provider import data_provider
 
 load_figure_template("LUX")
 
 app = Dash(__name__, external_stylesheets=[dbc.themes.LUX])
 server = app.server  # For deployment
+# element payloads are large and repetitive, they shrink well
+compress_responses(server)
 
-app.layout = serve_layout()
+app.layout = serve_layout
+
+# reload the data in the background when the source files change
+data_provider.start_watching()
@@ -0,0 +1,105 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    elements: {
+        // Element list of components.cytoscape.Elements.encode, strings are
+        // referred to by position and edge ids default to "source->target"
+        decode: function (encoded) {
+            if (Array.isArray(encoded)) {
+                return encoded;
+            }
+            const strings = encoded.strings;
+            const string = function (code) {
+                return code < 0 ? null : strings[code];
+            };
+
+            const elements = [];
+            const nodes = encoded.nodes;
+            for (let i = 0; i < nodes.id.length; i++) {
+                const element = {
+                    data: {
+                        id: string(nodes.id[i]),
+                        label: string(nodes.label[i]),
+                        type: string(nodes.type[i]),
+                        parent: string(nodes.parent[i]),
+                    },
+                    classes: string(nodes.classes[i]),
+                };
+                if (nodes.x && nodes.x[i] !== null) {
+                    element.position = {x: nodes.x[i], y: nodes.y[i]};
+                }
+                elements.push(element);
+            }
+
+            const edges = encoded.edges;
+            for (let i = 0; i < edges.source.length; i++) {
+                const source = string(edges.source[i]);
+                const target = string(edges.target[i]);
+                elements.push({
+                    data: {
+                        id: edges.id ? string(edges.id[i]) : source + "->" + target,
+                        source: source,
+                        target: target,
+                    },
+                    classes: edges.classes ? string(edges.classes[i]) : "edge",
+                });
+            }
+            return elements;
+        },
+
+        // Apply a patch built by components.cytoscape.Elements.diff to the
+        // current element list, {elements: [...]} replaces it entirely.
+        // Element lists can be encoded by Elements.encode
+        patch: function (elements, patch) {
+            const decode = window.dash_clientside.elements.decode;
+            if (patch.elements) {
+                return decode(patch.elements);
+            }
+
+            const removed = new Set(patch.remove);
+            const updated = new Map();
+            decode(patch.update).forEach(function (element) {
+                updated.set(element.data.id, element);
+            });
+
+            const patched = [];
+            (elements || []).forEach(function (element) {
+                const id = element.data.id;
+                if (removed.has(id)) {
+                    return;
+                }
+                patched.push(updated.has(id) ? updated.get(id) : element);
+            });
+            return patched.concat(decode(patch.add));
+        },
+
+        // Cytoscape.js ignores parent changes made through data(), nodes
+        // that changed cluster are moved on the rendered graph instead
+        moveNodes: function (patch) {
+            const cy = window.dash_clientside.lineage.getCy("cytoscape");
+            if (!cy || patch.elements) {
+                return;
+            }
+            cy.batch(function () {
+                window.dash_clientside.elements.decode(patch.update).forEach(function (element) {
+                    const node = cy.getElementById(element.data.id);
+                    if (!node.isNode()) {
+                        return;
+                    }
+                    const parent = element.data.parent || null;
+                    const current = node.parent().length ? node.parent().id() : null;
+                    // a cluster added by the same patch is not rendered yet
+                    if (parent !== current && (parent === null || cy.getElementById(parent).length)) {
+                        node.move({parent: parent});
+                    }
+                });
+            });
+        },
+
+        applyPatch: function (patch, elements) {
+            if (!patch) {
+                return window.dash_clientside.no_update;
+            }
+            window.dash_clientside.elements.moveNodes(patch);
+            return window.dash_clientside.elements.patch(elements, patch);
+        },
+    },
+});
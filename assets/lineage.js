@@ -0,0 +1,108 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    lineage: {
+        // Cytoscape.js registers the instance on its container element
+        getCy: function (id) {
+            const container = document.getElementById(id);
+            return container && container._cyreg ? container._cyreg.cy : null;
+        },
+
+        // Nodes and edges on any complete path through `nodeIds`, walking the
+        // CSR adjacency built by components.lineage.csr_adjacency
+        traverse: function (adjacency, nodeIds) {
+            const ids = adjacency.ids;
+            const position = new Map();
+            ids.forEach(function (id, i) {
+                position.set(id, i);
+            });
+
+            function degree(i) {
+                return adjacency.out_indptr[i + 1] - adjacency.out_indptr[i]
+                    + adjacency.in_indptr[i + 1] - adjacency.in_indptr[i];
+            }
+
+            function closure(sources, indptr, indices) {
+                const seen = new Uint8Array(ids.length);
+                const queue = sources.slice();
+                sources.forEach(function (i) {
+                    seen[i] = 1;
+                });
+                for (let head = 0; head < queue.length; head++) {
+                    const node = queue[head];
+                    for (let k = indptr[node]; k < indptr[node + 1]; k++) {
+                        const neighbor = indices[k];
+                        if (!seen[neighbor]) {
+                            seen[neighbor] = 1;
+                            queue.push(neighbor);
+                        }
+                    }
+                }
+                return queue;
+            }
+
+            // isolated nodes are not part of any complete path
+            const sources = [];
+            nodeIds.forEach(function (id) {
+                const i = position.get(id);
+                if (i !== undefined && degree(i) > 0) {
+                    sources.push(i);
+                }
+            });
+
+            const up = closure(sources, adjacency.in_indptr, adjacency.in_indices);
+            const down = closure(sources, adjacency.out_indptr, adjacency.out_indices);
+
+            const nodes = new Set();
+            const edges = new Set();
+            up.forEach(function (v) {
+                nodes.add(ids[v]);
+                for (let k = adjacency.in_indptr[v]; k < adjacency.in_indptr[v + 1]; k++) {
+                    edges.add(ids[adjacency.in_indices[k]] + "->" + ids[v]);
+                }
+            });
+            down.forEach(function (u) {
+                nodes.add(ids[u]);
+                for (let k = adjacency.out_indptr[u]; k < adjacency.out_indptr[u + 1]; k++) {
+                    edges.add(ids[u] + "->" + ids[adjacency.out_indices[k]]);
+                }
+            });
+
+            return {nodes: Array.from(nodes), edges: Array.from(edges)};
+        },
+
+        // Clientside counterpart of callbacks.highlight_nodes.highlight_paths
+        tapLineage: function (nodeData, adjacency, selectedNode) {
+            if (!nodeData || !adjacency) {
+                return [null, null];
+            }
+            if (selectedNode && selectedNode === nodeData.id) {
+                return [null, null];
+            }
+            const highlighted = window.dash_clientside.lineage.traverse(adjacency, [nodeData.id]);
+            return [highlighted, nodeData.id];
+        },
+
+        // Toggle the highlight classes for {nodes: [ids], edges: [ids]}
+        applyHighlight: function (highlighted) {
+            const cy = window.dash_clientside.lineage.getCy("cytoscape");
+            if (!cy) {
+                return window.dash_clientside.no_update;
+            }
+
+            cy.batch(function () {
+                cy.elements(".highlighted-node, .highlighted-edge")
+                    .removeClass("highlighted-node highlighted-edge");
+                if (!highlighted) {
+                    return;
+                }
+                highlighted.nodes.forEach(function (id) {
+                    cy.getElementById(id).addClass("highlighted-node");
+                });
+                highlighted.edges.forEach(function (id) {
+                    cy.getElementById(id).addClass("highlighted-edge");
+                });
+            });
+
+            return highlighted ? highlighted.nodes.length + highlighted.edges.length : 0;
+        },
+    },
+});
@@ -66,6 +66,23 @@ default_stylesheet = [
             "background-color": "#EF553B",
         },
     },
+    # Lineage highlighting, toggled on the elements by assets/lineage.js
+    {
+        "selector": ".highlighted-node",
+        "style": {
+            "background-color": "#FFD700",
+            "font-weight": "bold",
+        },
+    },
+    {
+        "selector": ".highlighted-edge",
+        "style": {
+            "line-color": "#767676",
+            "width": 1.6,
+            "target-arrow-color": "#767676",
+            "arrow-scale": 1.1,
+        },
+    },
 ]
 
 SIDEBAR_STYLE = {
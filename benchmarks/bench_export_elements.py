@@ -0,0 +1,36 @@
+"""
+Compare validated and column-based element export.
+
+    python benchmarks/bench_export_elements.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_graph_properties import synthetic_graph  # noqa: E402
+from components.graph import Graph  # noqa: E402
+
+
+def run(sizes=(10_000, 50_000, 100_000)):
+    print(f"{'elements':>9} {'validated':>10} {'records':>9}")
+    for size in sizes:
+        nodes, edges = synthetic_graph(size // 3)
+        graph = Graph(nodes, edges, clusters={})
+        num_elements = len(nodes) + len(edges)
+
+        start = time.perf_counter()
+        graph.export_elements().model_dump()["elements"]
+        validated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph.export_records(validate_sample=True)
+        records = time.perf_counter() - start
+
+        print(f"{num_elements:>9} {validated:>10.3f} {records:>9.3f}")
+
+
+if __name__ == "__main__":
+    run()
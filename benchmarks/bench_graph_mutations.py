@@ -0,0 +1,49 @@
+"""
+Time small edits of a built Graph against building it again.
+
+    python benchmarks/bench_graph_mutations.py
+
+An edit should cost a small fraction of a rebuild.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_graph_properties import synthetic_graph  # noqa: E402
+from components.graph import Graph  # noqa: E402
+
+
+def run(sizes=(5_000, 10_000, 15_000), num_edits: int = 10):
+    print(f"{'nodes':>8} {'rebuild s':>10} {'add s':>8} {'remove s':>9}")
+    for size in sizes:
+        nodes, edges = synthetic_graph(size)
+        start = time.perf_counter()
+        graph = Graph(nodes.copy(), edges.copy(), lineage_index=True)
+        # the index is built lazily, a rebuild pays for it on the next query
+        graph.lineage_index
+        rebuild = time.perf_counter() - start
+
+        # forward edges between late nodes keep the graph acyclic
+        added = pd.DataFrame(
+            {
+                "source": [f"n{size - 2 * i - 2}" for i in range(num_edits)],
+                "target": [f"n{size - 2 * i - 1}" for i in range(num_edits)],
+            }
+        )
+        start = time.perf_counter()
+        graph.add_edges(added)
+        add = time.perf_counter() - start
+
+        start = time.perf_counter()
+        graph.remove_edges(graph.edges["id"].iloc[-num_edits:])
+        remove = time.perf_counter() - start
+        print(f"{size:>8} {rebuild:>10.3f} {add:>8.3f} {remove:>9.3f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,57 @@
+"""
+Time Graph construction on synthetic layered lineage graphs.
+
+    python benchmarks/bench_graph_properties.py
+
+Time per node should stay roughly flat as the graph grows.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from components.graph import Graph  # noqa: E402
+
+
+def synthetic_graph(num_nodes: int, edges_per_node: int = 2, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"n{i}" for i in range(num_nodes)], dtype=object)
+    num_measures = num_nodes * 4 // 5
+
+    nodes = pd.DataFrame(
+        {
+            "id": ids,
+            "label": ids,
+            "type": np.where(np.arange(num_nodes) < num_measures, "measure", "visual"),
+            "parent": np.where(np.arange(num_nodes) < num_measures, "table", "page"),
+        }
+    )
+
+    # edges only point forward, so the graph is acyclic
+    targets = np.repeat(np.arange(1, num_nodes), edges_per_node)
+    sources = (rng.random(len(targets)) * targets).astype(int)
+    edges = pd.DataFrame({"source": ids[sources], "target": ids[targets]})
+    edges = edges.drop_duplicates().reset_index(drop=True)
+    return nodes, edges
+
+
+def run(sizes=(5_000, 10_000, 20_000, 50_000), repeat: int = 3, backend: str = "networkx"):
+    print(f"{backend}\n{'nodes':>8} {'edges':>8} {'seconds':>9} {'us/node':>8}")
+    for size in sizes:
+        nodes, edges = synthetic_graph(size)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            Graph(nodes.copy(), edges.copy(), backend=backend)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>8} {len(edges):>8} {best:>9.3f} {best / size * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
+    run(backend="csr")
@@ -0,0 +1,43 @@
+"""
+Time the server-side layered layout of synthetic DAGs, and placing a
+grouped view from the layout of the whole graph instead of laying it out.
+
+    python benchmarks/bench_layout.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_rollup import synthetic_hierarchy  # noqa: E402
+from components.graph import Graph  # noqa: E402
+from components.layered_layout import layered_positions  # noqa: E402
+
+
+def run(sizes=(5_000, 20_000, 50_000, 100_000), repeat: int = 3):
+    print(f"{'nodes':>8} {'edges':>8} {'seconds':>9} {'layers':>7} {'view':>7} {'placed':>7}")
+    for size in sizes:
+        nodes, edges, clusters = synthetic_hierarchy(size)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            positions = layered_positions(nodes, edges)
+            best = min(best, time.perf_counter() - start)
+
+        graph = Graph(nodes, edges, clusters)
+        graph.cluster_positions
+        view = graph.rollup.detail({"measure": "dataset", "visual": "report"}, ["l0", "c0"])
+        start = time.perf_counter()
+        graph.place(view)
+        placed = time.perf_counter() - start
+
+        print(
+            f"{size:>8} {len(edges):>8} {best:>9.3f} {positions['x'].nunique():>7} "
+            f"{len(view.nodes):>7} {placed:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+"""
+Compare a cold CSV load with a warm load from the columnar model cache, on
+their own and followed by building the graph of the loaded data.
+
+    python benchmarks/bench_load_data.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from components.graph import Graph  # noqa: E402
+from services import data_loader  # noqa: E402
+from services.graph_cache import graph_tables  # noqa: E402
+from services.model_cache import ModelCache  # noqa: E402
+
+
+def write_export(directory: Path, num_nodes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    is_measure = np.arange(num_nodes) < num_nodes * 4 // 5
+    workspace = rng.integers(0, 20, num_nodes)
+    location = workspace * 10 + rng.integers(0, 10, num_nodes)
+    source = location * 20 + rng.integers(0, 20, num_nodes)
+
+    nodes = pd.DataFrame(
+        {
+            "id": [f"n{i}" for i in range(num_nodes)],
+            "label": [f"node {i}" for i in range(num_nodes)],
+            "node_type": np.where(is_measure, "measure", "visual"),
+            "source": np.where(is_measure, "t", "p") + source.astype(str),
+            "source_label": np.where(is_measure, "table ", "page ") + source.astype(str),
+            "location": np.where(is_measure, "d", "r") + location.astype(str),
+            "location_label": np.where(is_measure, "dataset ", "report ") + location.astype(str),
+            "workspace": "w" + workspace.astype(str),
+            "workspace_label": "workspace " + workspace.astype(str),
+        }
+    )
+    targets = np.repeat(np.arange(1, num_nodes), 2)
+    sources = (rng.random(len(targets)) * targets).astype(int)
+    edges = pd.DataFrame({"source": nodes["id"].to_numpy()[sources], "target": nodes["id"].to_numpy()[targets]})
+
+    nodes.to_csv(directory / "nodes.csv", index=False)
+    edges.drop_duplicates().to_csv(directory / "edges.csv", index=False)
+    return str(directory / "nodes.csv"), str(directory / "edges.csv")
+
+
+def _load_and_build(paths):
+    data = data_loader.load_data(*paths)
+    start = time.perf_counter()
+    Graph(*graph_tables(data["model"]))
+    return data["stats"]["seconds"], data["stats"]["seconds"] + time.perf_counter() - start
+
+
+def run(sizes=(20_000, 100_000)):
+    print(f"{'nodes':>8} {'cold s':>8} {'warm s':>8} {'speedup':>8} {'+graph cold':>12} {'+graph warm':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_export(Path(directory), size)
+            data_loader.model_cache = ModelCache(str(Path(directory) / "cache"))
+
+            cold, cold_graph = _load_and_build(paths)
+            warm, warm_graph = _load_and_build(paths)
+            print(f"{size:>8} {cold:>8.2f} {warm:>8.2f} {cold / warm:>7.1f}x {cold_graph:>12.2f} {warm_graph:>12.2f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,80 @@
+"""
+Compare grouping the graph on every toggle with switching between the
+precomputed rollup views.
+
+    python benchmarks/bench_rollup.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_graph_properties import synthetic_graph  # noqa: E402
+from components.graph import Graph  # noqa: E402
+from components.rollup import combinations  # noqa: E402
+
+
+def synthetic_hierarchy(num_nodes: int, cluster_size: int = 50):
+    """
+    Synthetic graph with measures in tables of datasets and visuals in pages
+    of reports, `cluster_size` nodes per table or page and as many tables or
+    pages per dataset or report.
+    """
+    nodes, edges = synthetic_graph(num_nodes)
+    is_measure = (nodes["type"] == "measure").to_numpy()
+    position = np.arange(num_nodes) // cluster_size
+    source = np.array([f"c{i}" for i in position], dtype=object)
+    location = np.array([f"l{i // cluster_size}" for i in position], dtype=object)
+
+    nodes["parent"] = source
+    nodes["table"] = np.where(is_measure, source, None)
+    nodes["page"] = np.where(is_measure, None, source)
+    nodes["dataset"] = np.where(is_measure, location, None)
+    nodes["report"] = np.where(is_measure, None, location)
+    nodes["workspace"] = "w"
+
+    clusters = {"workspace": [{"id": "w", "label": "w", "type": "workspace"}]}
+    for level, sources, parents, mask in [
+        ("table", source, location, is_measure),
+        ("page", source, location, ~is_measure),
+        ("dataset", location, None, is_measure),
+        ("report", location, None, ~is_measure),
+    ]:
+        ids = sorted(set(sources[mask]))
+        parent_of = dict(zip(sources, parents)) if parents is not None else {}
+        clusters[level] = [
+            {"id": id, "label": id, "type": level, "parent": parent_of.get(id, "w")} for id in ids
+        ]
+    return nodes, edges, clusters
+
+
+def run(sizes=(10_000, 50_000, 100_000)):
+    print(f"{'nodes':>8} {'group x9':>9} {'precompute':>11} {'lookup x9':>10}")
+    for size in sizes:
+        nodes, edges, clusters = synthetic_hierarchy(size)
+
+        graph = Graph(nodes, edges, clusters)
+        start = time.perf_counter()
+        for groupings in combinations():
+            graph.group(groupings, copy=True)
+        grouped = time.perf_counter() - start
+
+        graph = Graph(nodes, edges, clusters)
+        start = time.perf_counter()
+        graph.rollup.precompute()
+        precompute = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for groupings in combinations():
+            graph.rollup.view(groupings)
+        lookup = time.perf_counter() - start
+
+        print(f"{size:>8} {grouped:>9.3f} {precompute:>11.3f} {lookup:>10.6f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,66 @@
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from app import app
+from components.layout import ELEMENT_BUDGET, HIGHLIGHT_MODE
+from services.data_provider import data_provider
+from services.graph_cache import graph_view, view_adjacency, view_patch
+from services.session_store import session_model
+
+
+def toggle_cluster(node_data, view):
+    """
+    Expand a tapped cluster into its children one level down, or collapse
+    an expanded one back, as long as the view stays within the element
+    budget.
+    """
+    if not node_data or not view:
+        raise PreventUpdate
+
+    dataset_key, model = session_model(view["dataset"])
+    if dataset_key != view["dataset"]:
+        # the rendered model is gone, the view moves to the current data
+        # collapsed and every element is sent again
+        new_view = {**view, "dataset": dataset_key, "version": data_provider.version_of(dataset_key), "expanded": []}
+        adjacency = None
+        if HIGHLIGHT_MODE == "client":
+            adjacency = view_adjacency(model, view["table"], view["groupings"], key=dataset_key)
+        return view_patch(None, None, model, new_view), new_view, adjacency
+
+    base = graph_view(model, view["table"], key=view["dataset"])
+    expanded = set(view.get("expanded") or [])
+    current = graph_view(model, view["table"], view["groupings"], key=view["dataset"], expanded=expanded)
+
+    cluster_id = node_data["id"]
+    if cluster_id in expanded:
+        # the compound node of an expanded cluster, nested clusters close with it
+        expanded -= {cluster_id} | base.rollup.descendants(cluster_id)
+    elif base.rollup.is_cluster(cluster_id) and cluster_id in current.attributes:
+        # a cluster shown as a single node
+        expanded.add(cluster_id)
+        g = graph_view(model, view["table"], view["groupings"], key=view["dataset"], expanded=expanded)
+        if g.num_elements > ELEMENT_BUDGET:
+            raise PreventUpdate
+    else:
+        raise PreventUpdate
+
+    new_view = {**view, "expanded": sorted(expanded)}
+    patch = view_patch(model, view, model, new_view)
+
+    adjacency = None
+    if HIGHLIGHT_MODE == "client":
+        adjacency = view_adjacency(
+            model, view["table"], view["groupings"], key=view["dataset"], expanded=new_view["expanded"]
+        )
+
+    return patch, new_view, adjacency
+
+
+if ELEMENT_BUDGET > 0:
+    app.callback(
+        Output("elements-patch", "data", allow_duplicate=True),
+        Output("elements", "data", allow_duplicate=True),
+        Output("adjacency", "data", allow_duplicate=True),
+        Input("cytoscape", "tapNodeData"),
+        State("elements", "data"),
+        prevent_initial_call=True,
+    )(toggle_cluster)
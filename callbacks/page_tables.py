@@ -0,0 +1,54 @@
+from dash import ctx
+from dash.dependencies import Input, Output, State
+from app import app
+from services.graph_cache import graph_view
+from services.session_store import session_model
+
+
+def _view_graph(view):
+    # rows of the current data if the rendered model is gone, the view is
+    # reset to it by callbacks.reload_data
+    dataset_key, model = session_model(view["dataset"])
+    return graph_view(model, view["table"], view["groupings"], key=dataset_key, expanded=view.get("expanded"))
+
+
+@app.callback(
+    Output("node-table", "data"),
+    Output("node-table", "page_count"),
+    Input("node-table", "page_current"),
+    Input("node-table", "page_size"),
+    Input("node-table", "sort_by"),
+    Input("node-table", "filter_query"),
+    Input("elements", "data"),
+)
+def page_nodes(page_current, page_size, sort_by, filter_query, view):
+    # the rows of the rendered view, only the requested page is sent
+    return _view_graph(view).node_table.page(page_current, page_size, filter_query, sort_by)
+
+
+@app.callback(
+    Output("dependency-table", "data"),
+    Output("dependency-table", "page_count"),
+    Output("dependency-table", "page_current"),
+    Output("dependency-node", "data"),
+    Output("dependency-title", "children"),
+    Input("cytoscape", "tapNodeData"),
+    Input("node-table", "active_cell"),
+    Input("dependency-table", "page_current"),
+    Input("dependency-table", "page_size"),
+    Input("dependency-table", "sort_by"),
+    Input("elements", "data"),
+    State("dependency-node", "data"),
+)
+def page_dependencies(node_data, active_cell, page_current, page_size, sort_by, view, node_id):
+    # a node is picked by tapping it in the graph or a cell of its row
+    if ctx.triggered_id == "cytoscape" and node_data:
+        node_id, page_current = node_data["id"], 0
+    elif ctx.triggered_id == "node-table" and active_cell:
+        node_id, page_current = active_cell["row_id"], 0
+
+    table = _view_graph(view).node_table
+    if node_id is None or node_id not in table:
+        return [], 1, 0, None, "Dependencies"
+    data, page_count = table.dependency_page(node_id, page_current, page_size, sort_by)
+    return data, page_count, page_current, node_id, f"Dependencies of {node_id}"
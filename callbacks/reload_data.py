@@ -0,0 +1,59 @@
+from dash import ClientsideFunction
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from app import app
+from components.layout import HIGHLIGHT_MODE
+from services.data_provider import data_provider
+from services.graph_cache import view_adjacency, view_patch
+from services.session_store import session_model
+
+
+def push_data_updates(n_intervals, view):
+    """
+    Patch of the rendered elements once the data provider reloaded the
+    source files, only the elements that changed in the current view are
+    sent.
+
+    Every worker reloads on its own schedule, so the data of the worker
+    answering can be older than the rendered one. Only newer data is
+    pushed, the page would move back and forth otherwise.
+    """
+    data = data_provider.get()
+    if not view or view["dataset"] == data["key"] or data["version"] <= view.get("version", 0):
+        raise PreventUpdate
+
+    key = data["key"]
+    model = data["model"]
+    new_view = {**view, "dataset": key, "version": data["version"]}
+
+    # the rendered model can be gone, e.g. evicted from the session store,
+    # every element is sent again then
+    old_key, old_model = session_model(view["dataset"])
+    if old_key != view["dataset"]:
+        old_model = None
+    patch = view_patch(old_model, view, model, new_view)
+
+    adjacency = None
+    if HIGHLIGHT_MODE == "client":
+        adjacency = view_adjacency(
+            model, view["table"], view["groupings"], key=key, expanded=view.get("expanded")
+        )
+
+    return patch, new_view, adjacency
+
+
+app.callback(
+    Output("elements-patch", "data", allow_duplicate=True),
+    Output("elements", "data", allow_duplicate=True),
+    Output("adjacency", "data", allow_duplicate=True),
+    Input("data-poll", "n_intervals"),
+    State("elements", "data"),
+    prevent_initial_call=True,
+)(push_data_updates)
+
+app.clientside_callback(
+    ClientsideFunction(namespace="elements", function_name="applyPatch"),
+    Output("cytoscape", "elements"),
+    Input("elements-patch", "data"),
+    State("cytoscape", "elements"),
+)
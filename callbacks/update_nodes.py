@@ -1,44 +1,56 @@
 from dash.dependencies import Input, Output, State
 from app import app
-from components.cytoscape import Elements
-from components.graph import Graph
-from components.nodes_model import Nodes
-from services.data_loader import load_data
+from components.layout import ELEMENT_BUDGET, HIGHLIGHT_MODE
+from services.data_provider import data_provider
+from services.graph_cache import fit_groupings, view_adjacency, view_patch
+from services.session_store import session_model
 
 
 @app.callback(
-    Output("cytoscape", "elements"),
+    Output("elements-patch", "data", allow_duplicate=True),
     Output("elements", "data"),
+    Output("adjacency", "data"),
+    Output("group-measures", "value"),
+    Output("group-visuals", "value"),
     Input("group-measures", "value"),
     Input("group-visuals", "value"),
     Input("table-filter", "value"),
-    Input("initial-data", "data"),
+    State("elements", "data"),
     prevent_initial_call=True,
 )
-def group_nodes(group_measures, group_visuals, selected_table, model):
-    # load the data
-    # _elements = Elements(elements=elements)
-    # g = Graph.from_elements(_elements)
-    _model = Nodes(**model)
-    g = Graph.from_model(_model)
+def group_nodes(group_measures, group_visuals, selected_table, current_view):
+    groupings = {}
+    if group_measures and not group_measures == "default":
+        groupings["measure"] = group_measures
+    if group_visuals and not group_visuals == "default":
+        groupings["visual"] = group_visuals
 
-    if selected_table:
-        g.select_related_elements(
-            selected_cluster="table",
-            selected_values=selected_table, copy=False)
+    # the view follows the data pushed by callbacks.reload_data, or moves to
+    # the current data if the rendered model is gone
+    dataset_key, model = session_model(current_view["dataset"])
 
-    if group_measures:
-        group_by_measures = group_measures
-        type = "measure"
-        if not group_by_measures == "default":
-            g.group_by(group_by=group_by_measures, type=type, copy=False)
+    # built graphs and their views are cached per model, table filter and grouping
+    groupings = fit_groupings(model, selected_table, groupings, ELEMENT_BUDGET, key=dataset_key)
+    version = current_view.get("version", 0)
+    if dataset_key != current_view["dataset"]:
+        version = data_provider.version_of(dataset_key)
+    view = {
+        "dataset": dataset_key,
+        "version": version,
+        "table": selected_table,
+        "groupings": groupings,
+        "expanded": [],
+    }
 
-    if group_visuals:
-        group_by_visuals = group_visuals
-        type = "visual"
+    # only the elements that differ from the rendered view are sent, all of
+    # them when the view moved to other data
+    old_model = model if dataset_key == current_view["dataset"] else None
+    patch = view_patch(old_model, current_view, model, view)
 
-        if not group_by_visuals == "default":
-            g.group_by(group_by=group_by_visuals, type=type, copy=False)
+    adjacency = None
+    if HIGHLIGHT_MODE == "client":
+        adjacency = view_adjacency(model, selected_table, groupings, key=dataset_key)
 
-    _elements = g.export_elements().model_dump()["elements"]
-    return _elements, _elements
+    # the radio items show the grouping rendered, which can be coarser than
+    # the one picked
+    return patch, view, adjacency, groupings.get("measure", "default"), groupings.get("visual", "default")
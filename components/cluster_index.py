@@ -0,0 +1,54 @@
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class ClusterIndex:
+    """
+    Node rows of every cluster, by cluster id and by label, for each level of
+    the hierarchy ("workspace", "dataset", "table", ...) that is a column of
+    the nodes frame. Built in one grouping pass, members of k clusters are
+    then found in O(k).
+    """
+
+    def __init__(self, nodes: pd.DataFrame, clusters: dict = None):
+        self._rows = {}
+        self._by_label = {}
+        for level, items in (clusters or {}).items():
+            if level not in nodes.columns:
+                continue
+            self._rows[level] = nodes.groupby(level, sort=False).indices
+
+            by_label = defaultdict(list)
+            for item in items:
+                by_label[item["label"]].append(item["id"])
+            self._by_label[level] = dict(by_label)
+
+    def levels(self) -> list:
+        return list(self._rows)
+
+    def cluster_ids(self, level: str, labels: Iterable[str]) -> list:
+        """
+        Ids of the clusters of `level` labelled one of `labels`, labels can
+        be shared by clusters under different parents.
+        """
+        by_label = self._by_label.get(level, {})
+        return [cluster_id for label in dict.fromkeys(labels) for cluster_id in by_label.get(label, [])]
+
+    def rows(self, level: str, ids: Iterable[str] = None, labels: Iterable[str] = None) -> np.ndarray:
+        """
+        Sorted positions of the node rows in the clusters `ids`, or in the
+        clusters labelled one of `labels`.
+        """
+        if ids is None:
+            ids = self.cluster_ids(level, labels or [])
+        rows = self._rows.get(level, {})
+        members = [rows[cluster_id] for cluster_id in dict.fromkeys(ids) if cluster_id in rows]
+        if not members:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(members))
+
+    def size(self, level: str, cluster_id: str) -> int:
+        return len(self._rows.get(level, {}).get(cluster_id, []))
@@ -0,0 +1,139 @@
+from typing import Iterable, Set, Tuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+
+def _compress(rows: np.ndarray, cols: np.ndarray, num_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+    return indptr, cols[order]
+
+
+class CSRGraph:
+    """
+    Directed graph over node ids interned to int32 positions. Successors are
+    stored as CSR arrays and predecessors as CSC arrays, a few bytes per edge
+    instead of networkx's dicts. Node attributes stay in the Graph frames.
+    """
+
+    def __init__(self, ids: np.ndarray, sources: np.ndarray, targets: np.ndarray):
+        self.ids = ids
+        self.index = pd.Index(ids)
+        self.sources = sources
+        self.targets = targets
+        self.out_indptr, self.out_indices = _compress(sources, targets, len(ids))
+        self.in_indptr, self.in_indices = _compress(targets, sources, len(ids))
+
+    @classmethod
+    def from_edges(cls, sources: pd.Series, targets: pd.Series) -> "CSRGraph":
+        """
+        Graph of the (source, target) pairs. Nodes are numbered in order of
+        first appearance and repeated edges are kept once, like
+        `nx.from_pandas_edgelist`.
+        """
+        pairs = np.column_stack([np.asarray(sources, dtype=object), np.asarray(targets, dtype=object)])
+        codes, ids = pd.factorize(pairs.ravel())
+        codes = codes.reshape(-1, 2).astype(np.int64)
+
+        # first occurrence of every distinct edge, in input order
+        _, first = np.unique(codes[:, 0] * max(len(ids), 1) + codes[:, 1], return_index=True)
+        codes = codes[np.sort(first)].astype(np.int32)
+        return cls(np.asarray(ids, dtype=object), codes[:, 0], codes[:, 1])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.index
+
+    def number_of_nodes(self) -> int:
+        return len(self.ids)
+
+    def number_of_edges(self) -> int:
+        return len(self.sources)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.sources, self.targets, self.out_indptr, self.out_indices, self.in_indptr, self.in_indices]
+        return int(sum(a.nbytes for a in arrays) + self.ids.nbytes + self.index.nbytes)
+
+    def positions(self, node_ids: Iterable[str]) -> np.ndarray:
+        positions = self.index.get_indexer(list(node_ids))
+        return positions[positions >= 0]
+
+    def out_degree(self, node: str) -> int:
+        i = self.index.get_loc(node)
+        return int(self.out_indptr[i + 1] - self.out_indptr[i])
+
+    def in_degree(self, node: str) -> int:
+        i = self.index.get_loc(node)
+        return int(self.in_indptr[i + 1] - self.in_indptr[i])
+
+    def degree(self, node: str) -> int:
+        return self.out_degree(node) + self.in_degree(node)
+
+    def _degrees(self) -> np.ndarray:
+        return np.diff(self.out_indptr) + np.diff(self.in_indptr)
+
+    def _closure(self, positions: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        # breadth-first, one vectorized step per level of the graph
+        seen = np.zeros(len(self.ids), dtype=bool)
+        seen[positions] = True
+        frontier = np.unique(positions)
+        while frontier.size:
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            lengths = ends - starts
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            neighbors = indices[offsets + np.arange(lengths.sum())]
+            frontier = np.unique(neighbors[~seen[neighbors]])
+            seen[frontier] = True
+        return seen
+
+    def upstream(self, node_ids: Iterable[str]) -> Set[str]:
+        """
+        Nodes that reach any of `node_ids`, including the nodes themselves.
+        """
+        mask = self._closure(self.positions(node_ids), self.in_indptr, self.in_indices)
+        return set(self.ids[mask])
+
+    def downstream(self, node_ids: Iterable[str]) -> Set[str]:
+        """
+        Nodes reachable from any of `node_ids`, including the nodes themselves.
+        """
+        mask = self._closure(self.positions(node_ids), self.out_indptr, self.out_indices)
+        return set(self.ids[mask])
+
+    def lineage(self, node_ids: Iterable[str]) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        """
+        Same as `components.lineage.lineage`, on the arrays.
+        """
+        positions = self.positions(node_ids)
+        # isolated nodes are not part of any complete path
+        positions = positions[self._degrees()[positions] > 0]
+        up = self._closure(positions, self.in_indptr, self.in_indices)
+        down = self._closure(positions, self.out_indptr, self.out_indices)
+
+        on_path = up[self.targets] | down[self.sources]
+        edges = zip(self.ids[self.sources[on_path]], self.ids[self.targets[on_path]])
+        return set(self.ids[up | down]), set(edges)
+
+    def adjacency(self) -> dict:
+        """
+        Same payload as `components.lineage.csr_adjacency`.
+        """
+        return {
+            "ids": self.ids.tolist(),
+            "out_indptr": self.out_indptr.tolist(),
+            "out_indices": self.out_indices.tolist(),
+            "in_indptr": self.in_indptr.tolist(),
+            "in_indices": self.in_indices.tolist(),
+        }
+
+    def to_networkx(self) -> nx.DiGraph:
+        g = nx.DiGraph()
+        g.add_nodes_from(self.ids.tolist())
+        g.add_edges_from(zip(self.ids[self.sources].tolist(), self.ids[self.targets].tolist()))
+        return g
@@ -3,6 +3,7 @@ from pydantic import BaseModel, computed_field
 from dataclasses import dataclass, asdict
 from typing import List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 from components.nodes_model import Nodes
@@ -165,7 +166,7 @@ class Elements(BaseModel):
                 classes=node["type"],
                 _type = "nodes"
             )
-            for _, node in nodes.iterrows()
+            for node in nodes.to_dict("records")
         ]
 
     @staticmethod
@@ -175,5 +176,133 @@ class Elements(BaseModel):
                 data=Edge(**edge), 
                 classes="edge"
             )
-            for _, edge in edges.iterrows()
+            for edge in edges.to_dict("records")
         ]
+
+    @staticmethod
+    def _columns(frame: pd.DataFrame, columns: List[str]) -> List[list]:
+        # plain python values, with missing values as None
+        frame = frame[columns].astype(object)
+        frame = frame.where(frame.notna(), None)
+        return [frame[column].tolist() for column in columns]
+
+    @staticmethod
+    def node_records(nodes: pd.DataFrame, positions: pd.DataFrame = None) -> List[dict]:
+        """
+        Same dicts as `Element.model_dump()` of `nodes_from_dataframe`, built
+        without validating each element. With `positions`, x and y columns
+        indexed by node id, nodes get the position the preset layout uses.
+        """
+        ids, labels, types, parents = Elements._columns(nodes, ["id", "label", "type", "parent"])
+        records = [
+            {
+                "data": {"id": id, "label": label, "type": type, "parent": parent},
+                "classes": type,
+            }
+            for id, label, type, parent in zip(ids, labels, types, parents)
+        ]
+        if positions is not None:
+            xy = positions.reindex(nodes["id"])
+            for record, x, y in zip(records, xy["x"].tolist(), xy["y"].tolist()):
+                if x == x and y == y:
+                    record["position"] = {"x": x, "y": y}
+        return records
+
+    @staticmethod
+    def diff(old: List[dict], new: List[dict]) -> dict:
+        """
+        Patch turning the element dicts `old` into `new`: the ids to remove,
+        the elements to add and the elements whose data or classes changed.
+        """
+        before = {element["data"]["id"]: element for element in old}
+        after = {element["data"]["id"]: element for element in new}
+        return {
+            "remove": [id for id in before if id not in after],
+            "add": [element for id, element in after.items() if id not in before],
+            "update": [
+                element for id, element in after.items() if id in before and before[id] != element
+            ],
+        }
+
+    @staticmethod
+    def edge_records(edges: pd.DataFrame) -> List[dict]:
+        """
+        Same dicts as `Element.model_dump()` of `edges_from_dataframe`, built
+        without validating each element.
+        """
+        ids, sources, targets = Elements._columns(edges, ["id", "source", "target"])
+        return [
+            {"data": {"id": id, "source": source, "target": target}, "classes": "edge"}
+            for id, source, target in zip(ids, sources, targets)
+        ]
+
+    @staticmethod
+    def encode(elements: List[dict]) -> dict:
+        """
+        Columnar form of the element dicts of `node_records`, `edge_records`
+        and clusters, decoded in the browser by `elements.decode`. Strings
+        are sent once and referred to by their position, missing ones as -1,
+        and edge ids are left out when they are "source->target".
+        """
+        nodes = [element for element in elements if "source" not in element["data"]]
+        edges = [element for element in elements if "source" in element["data"]]
+
+        node_columns = {
+            column: [element["data"][column] for element in nodes] for column in ["id", "label", "type", "parent"]
+        }
+        node_columns["classes"] = [element.get("classes") for element in nodes]
+        edge_columns = {column: [element["data"][column] for element in edges] for column in ["source", "target"]}
+        edge_ids = [element["data"]["id"] for element in edges]
+        if edge_ids != [f"{source}->{target}" for source, target in zip(edge_columns["source"], edge_columns["target"])]:
+            edge_columns["id"] = edge_ids
+        edge_classes = {element.get("classes") for element in edges}
+        if edge_classes - {"edge"}:
+            edge_columns["classes"] = [element.get("classes") for element in edges]
+
+        # one table of strings for every column, in a single factorize
+        columns = list(node_columns.values()) + list(edge_columns.values())
+        values = np.array([value for column in columns for value in column], dtype=object)
+        codes, strings = pd.factorize(values)
+        codes = codes.tolist()
+
+        encoded = {"strings": strings.tolist(), "nodes": {}, "edges": {}}
+        start = 0
+        for table, table_columns in [("nodes", node_columns), ("edges", edge_columns)]:
+            for column, column_values in table_columns.items():
+                encoded[table][column] = codes[start : start + len(column_values)]
+                start += len(column_values)
+
+        if any("position" in element for element in nodes):
+            for axis in ["x", "y"]:
+                encoded["nodes"][axis] = [
+                    element["position"][axis] if "position" in element else None for element in nodes
+                ]
+        return encoded
+
+    @staticmethod
+    def decode(encoded: dict) -> List[dict]:
+        """
+        Element dicts of `encode`, nodes first, as `elements.decode` builds
+        them in the browser.
+        """
+        strings = encoded["strings"]
+
+        def values(table, column):
+            return [strings[code] if code >= 0 else None for code in encoded[table][column]]
+
+        nodes = encoded["nodes"]
+        elements = []
+        for i, (id, label, type, parent, classes) in enumerate(
+            zip(*(values("nodes", column) for column in ["id", "label", "type", "parent", "classes"]))
+        ):
+            element = {"data": {"id": id, "label": label, "type": type, "parent": parent}, "classes": classes}
+            if "x" in nodes and nodes["x"][i] is not None:
+                element["position"] = {"x": nodes["x"][i], "y": nodes["y"][i]}
+            elements.append(element)
+
+        sources, targets = values("edges", "source"), values("edges", "target")
+        ids = values("edges", "id") if "id" in encoded["edges"] else [f"{s}->{t}" for s, t in zip(sources, targets)]
+        classes = values("edges", "classes") if "classes" in encoded["edges"] else ["edge"] * len(sources)
+        for id, source, target, edge_classes in zip(ids, sources, targets, classes):
+            elements.append({"data": {"id": id, "source": source, "target": target}, "classes": edge_classes})
+        return elements
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class Predicate:
+    """
+    Condition on the node rows of a Graph, combined with `&` and `|`.
+    """
+
+    def mask(self, graph) -> np.ndarray:
+        raise NotImplementedError
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return And((self, other))
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return Or((self, other))
+
+
+@dataclass(frozen=True)
+class Isin(Predicate):
+    """
+    Nodes whose `column`, e.g. "type" or "workspace", is one of `values`.
+    """
+
+    column: str
+    values: Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "values", tuple(self.values))
+
+    def mask(self, graph) -> np.ndarray:
+        return graph.categories(self.column).isin(self.values)
+
+
+@dataclass(frozen=True)
+class ClusterLabelIn(Predicate):
+    """
+    Nodes in a cluster of `level`, e.g. "table", labelled one of `labels`.
+    """
+
+    level: str
+    labels: Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "labels", tuple(self.labels))
+
+    def mask(self, graph) -> np.ndarray:
+        mask = np.zeros(len(graph.nodes), dtype=bool)
+        mask[graph.cluster_index.rows(self.level, labels=self.labels)] = True
+        return mask
+
+
+@dataclass(frozen=True)
+class And(Predicate):
+    predicates: Tuple[Predicate, ...]
+
+    def mask(self, graph) -> np.ndarray:
+        return np.logical_and.reduce([predicate.mask(graph) for predicate in self.predicates])
+
+
+@dataclass(frozen=True)
+class Or(Predicate):
+    predicates: Tuple[Predicate, ...]
+
+    def mask(self, graph) -> np.ndarray:
+        return np.logical_or.reduce([predicate.mask(graph) for predicate in self.predicates])
+
+
+@dataclass
+class Selection:
+    """
+    Node and edge rows of a graph matching a predicate, as boolean masks.
+    Rows are only copied out of the graph's frames when asked for.
+    """
+
+    graph: "Graph"
+    node_mask: np.ndarray
+    edge_mask: np.ndarray
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self.graph.nodes["id"].to_numpy()[self.node_mask]
+
+    @property
+    def nodes(self) -> pd.DataFrame:
+        return self.graph.nodes[self.node_mask]
+
+    @property
+    def edges(self) -> pd.DataFrame:
+        return self.graph.edges[self.edge_mask]
@@ -1,61 +1,151 @@
+import functools
 from typing import Self
 import networkx as nx
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+from components.cluster_index import ClusterIndex
+from components.csr_graph import CSRGraph
+from components.layered_layout import cluster_positions, layered_positions, place
+from components.rollup import Rollup
 from components.cytoscape import Edge, Element, Elements, Node
+from components.filters import Isin, Predicate, Selection
+from components.graph_diff import EDGE_COLUMNS, GraphDiff, diff_tables, edge_ids, placements
+from components.lineage import LINEAGE_INDEX_MAX_NODES, LineageIndex, csr_adjacency, downstream, lineage, upstream
+from components.node_table import NodeTable
 from components.nodes_model import Nodes
 
 
+BACKENDS = ["networkx", "csr"]
+
+
+def _memoized(func):
+    """
+    Property computed on first access and kept until the graph is modified.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        if name not in self._memo:
+            self._memo[name] = func(self)
+        return self._memo[name]
+
+    return property(getter)
+
+
 class Graph:
     def __init__(
         self,
         nodes: pd.DataFrame,
         edges: pd.DataFrame,
         clusters: Nodes = None,
+        lineage_index: bool = False,
+        lineage_index_max_nodes: int = LINEAGE_INDEX_MAX_NODES,
+        backend: str = "networkx",
     ):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown graph backend: {backend}")
+
         self.nodes: pd.DataFrame = nodes
         self.edges: pd.DataFrame = edges
         self.clusters: dict = clusters
 
-        self.g = None
-        self.complete_paths = []
-        self.mapping_node_to_path = {}
-        self._colors = {}
+        self.backend = backend
+        self.csr = None
+        self._g = None
+        self._use_lineage_index = lineage_index
+        self._lineage_index_max_nodes = lineage_index_max_nodes
+        self._memo = {}
         self._calculate_graph_properties()
 
     def _calculate_graph_properties(self):
-        self.g = nx.from_pandas_edgelist(
-            self.edges, "source", "target", create_using=nx.DiGraph()
-        )
-        # remove the is_leaf and is_root columns if they exist
-        if "is_leaf" in self.nodes.columns:
-            self.nodes.drop(columns=["is_leaf"], inplace=True)
-        if "is_root" in self.nodes.columns:
-            self.nodes.drop(columns=["is_root"], inplace=True)
-
-        self.nodes["is_leaf"] = self.nodes["id"].apply(
-            lambda x: len(list(self.g.successors(x))) == 0
-        )
-        self.nodes["is_root"] = self.nodes["id"].apply(
-            lambda x: len(list(self.g.predecessors(x))) == 0
-        )
+        if self.backend == "csr":
+            self.csr = CSRGraph.from_edges(self.edges["source"], self.edges["target"])
+            self._g = None
+        else:
+            self._g = nx.from_pandas_edgelist(
+                self.edges, "source", "target", create_using=nx.DiGraph()
+            )
 
-        self.edges["id"] = self.edges.apply(
-            lambda x: f"{x['source']}->{x['target']}", axis=1
+        self.edges["id"] = (
+            self.edges["source"].astype(str) + "->" + self.edges["target"].astype(str)
         )
 
-        # iterate over the nodes and add the attributes to the graph
-        for node, attrs in self.g.nodes(data=True):
-            attrs.update(self.nodes[self.nodes["id"] == node].squeeze().to_dict())
+        # everything else is derived on first use
+        self._memo = {}
+
+    @property
+    def g(self) -> nx.DiGraph:
+        """
+        networkx graph of the edges. The csr backend only builds it when it
+        is requested, e.g. to enumerate complete paths.
+        """
+        if self._g is None:
+            self._g = self.csr.to_networkx()
+        return self._g
+
+    @property
+    def structure(self):
+        """
+        Graph answering membership, degree and traversal queries, the CSR
+        arrays or the networkx graph depending on the backend.
+        """
+        return self.csr if self.backend == "csr" else self.g
 
-        self.complete_paths = self.compute_complete_paths()
-        self.mapping_node_to_path = self.map_node_to_paths()
+    def is_computed(self, name: str) -> bool:
+        return name in self._memo
+
+    @_memoized
+    def roots(self) -> set:
+        """
+        Ids of the nodes without incoming edges.
+        """
+        in_degree = self.nodes["id"].map(self.edges["target"].value_counts())
+        return set(self.nodes["id"][in_degree.isna().to_numpy()])
 
-        self._colors = self._index_colors(self.nodes)
+    @_memoized
+    def leaves(self) -> set:
+        """
+        Ids of the nodes without outgoing edges.
+        """
+        out_degree = self.nodes["id"].map(self.edges["source"].value_counts())
+        return set(self.nodes["id"][out_degree.isna().to_numpy()])
 
-    @classmethod
-    def from_model(cls, model: Nodes):
+    @_memoized
+    def attributes(self) -> dict:
+        """
+        Attributes of each node by id, taken from its first row.
+        """
+        return self.nodes.drop_duplicates(subset=["id"]).set_index("id", drop=False).to_dict("index")
+
+    @_memoized
+    def lineage_index(self):
+        # falls back to graph traversal if the graph is too large to index,
+        # the csr backend always traverses its arrays
+        if not self._use_lineage_index or self.backend == "csr":
+            return None
+        return LineageIndex.build(self.g, self._lineage_index_max_nodes)
+
+    @_memoized
+    def complete_paths(self) -> list:
+        return self.compute_complete_paths()
+
+    @_memoized
+    def mapping_node_to_path(self) -> dict:
+        return self.map_node_to_paths()
+
+    @_memoized
+    def colors(self) -> dict:
+        return self._index_colors(self.nodes)
+
+    @staticmethod
+    def tables_from_model(model: Nodes) -> tuple:
+        """
+        Node and edge frames and the clusters of `model`, as Graph takes them.
+        Clusters are listed without their children, those are the node rows.
+        """
         clusters = {
             "workspace": [],
             "dataset": [],
@@ -65,14 +155,14 @@ class Graph:
         }
         nodes = []
         for workspace in model.workspaces:
-            clusters["workspace"].append(workspace.model_dump(exclude_none=True))
+            clusters["workspace"].append(workspace.model_dump(exclude_none=True, exclude={"children"}))
             for dataset_or_report in workspace.children:
                 clusters[dataset_or_report.type].append(
-                    dataset_or_report.model_dump(exclude_none=True)
+                    dataset_or_report.model_dump(exclude_none=True, exclude={"children"})
                 )
                 for table_or_page in dataset_or_report.children:
                     clusters[table_or_page.type].append(
-                        table_or_page.model_dump(exclude_none=True)
+                        table_or_page.model_dump(exclude_none=True, exclude={"children"})
                     )
                     for visual_or_measure in table_or_page.children:
                         nodes.append(
@@ -94,10 +184,42 @@ class Graph:
                          )
             
         edges = pd.DataFrame(edges)
-        return cls(nodes, edges, clusters)
+        return nodes, edges, clusters
+
+    def _copy(self, nodes: pd.DataFrame, edges: pd.DataFrame, clusters: dict) -> Self:
+        # new graph over other frames, with the same options as this one
+        return Graph(
+            nodes,
+            edges,
+            clusters,
+            lineage_index=self._use_lineage_index,
+            lineage_index_max_nodes=self._lineage_index_max_nodes,
+            backend=self.backend,
+        )
+
+    def copy(self) -> Self:
+        """
+        Graph over the same frames with its own networkx graph, lineage index
+        and memo, so that mutating it leaves this graph as it is for the
+        readers holding it. The frames are not copied, mutations replace
+        them rather than modify them.
+        """
+        graph = Graph.__new__(Graph)
+        graph.__dict__.update(self.__dict__)
+        if self._g is not None:
+            graph._g = self._g.copy()
+        graph._memo = dict(self._memo)
+        if self._memo.get("lineage_index") is not None:
+            graph._memo["lineage_index"] = self._memo["lineage_index"].copy(graph._g)
+        return graph
 
     @classmethod
-    def from_elements(cls, elements: Elements):
+    def from_model(cls, model: Nodes, **kwargs):
+        nodes, edges, clusters = cls.tables_from_model(model)
+        return cls(nodes, edges, clusters, **kwargs)
+
+    @classmethod
+    def from_elements(cls, elements: Elements, **kwargs):
         nodes = pd.DataFrame(
             [
                 element.data.model_dump()
@@ -113,13 +235,13 @@ class Graph:
             ]
         )
 
-        return cls(nodes, edges)
+        return cls(nodes, edges, **kwargs)
 
     def compute_complete_paths(self) -> list:
         # TODO: receive only g as argument, nodes can be accessed from g.nodes()
         complete_paths = []
-        _roots = self.nodes[self.nodes["is_root"]]["id"]
-        _leaves = self.nodes[self.nodes["is_leaf"]]["id"]
+        _roots = [node for node in self.nodes["id"] if node in self.roots]
+        _leaves = [node for node in self.nodes["id"] if node in self.leaves]
 
         for root in _roots:
             for leaf in _leaves:
@@ -140,6 +262,287 @@ class Graph:
             node_to_paths[node] = [path for path in self.complete_paths if node in path]
         return node_to_paths
 
+    def categories(self, column: str) -> pd.Categorical:
+        """
+        `column` of the nodes frame as a categorical, memoized for filtering.
+        """
+        key = ("categories", column)
+        if key not in self._memo:
+            self._memo[key] = pd.Categorical(self.nodes[column])
+        return self._memo[key]
+
+    @property
+    def num_elements(self) -> int:
+        """
+        Number of elements `export_records` sends: clusters, nodes and edges.
+        """
+        return len(self.nodes) + len(self.edges) + sum(len(items) for items in (self.clusters or {}).values())
+
+    @_memoized
+    def positions(self) -> pd.DataFrame:
+        """
+        Layered layout of the graph, x and y columns indexed by node id.
+        """
+        return layered_positions(self.nodes, self.edges)
+
+    @_memoized
+    def cluster_positions(self) -> pd.DataFrame:
+        """
+        Centroid of the positions of the members of every cluster, where a
+        cluster shown as a single node is placed.
+        """
+        return cluster_positions(self.nodes, self.positions, list(self.clusters or {}))
+
+    def place(self, view: "Graph") -> pd.DataFrame:
+        """
+        Positions of the nodes of `view`, a filtered or grouped view of this
+        graph: nodes stay where they are in this graph's layout, clusters
+        start at the centroid of their members and the copies of a node
+        shown under several parents next to it.
+        """
+        ids = view.nodes["id"]
+        new = ids[~ids.isin(self.positions.index)]
+        copies = self.positions.reindex(new.str.rsplit("@", n=1).str[0]).set_axis(new.to_numpy()).dropna()
+        seeds = pd.concat([self.cluster_positions, copies])
+        return place(ids, view.edges, self.positions, seeds[~seeds.index.duplicated()])
+
+    @_memoized
+    def rollup(self) -> Rollup:
+        return Rollup(self)
+
+    @_memoized
+    def node_table(self) -> NodeTable:
+        return NodeTable(self)
+
+    @_memoized
+    def cluster_index(self) -> ClusterIndex:
+        return ClusterIndex(self.nodes, self.clusters)
+
+    def cluster_ids(self, level: str, labels) -> list:
+        return self.cluster_index.cluster_ids(level, labels)
+
+    def cluster_members(self, level: str, labels=None, ids=None) -> np.ndarray:
+        """
+        Ids of the nodes in the clusters of `level` with the given `ids` or
+        labelled one of `labels`.
+        """
+        rows = self.cluster_index.rows(level, ids=ids, labels=labels)
+        return self.nodes["id"].to_numpy()[rows]
+
+    @_memoized
+    def _endpoint_codes(self) -> tuple:
+        # node rows and edge endpoints numbered by distinct node id, -1 for
+        # endpoints without a node row
+        codes, ids = pd.factorize(self.nodes["id"])
+        ids = pd.Index(ids)
+        return codes, ids.get_indexer(self.edges["source"]), ids.get_indexer(self.edges["target"])
+
+    def select(self, predicate: Predicate) -> Selection:
+        """
+        Nodes matching `predicate` and the edges between them, e.g.
+        `graph.select(Isin("type", ["measure"]) & ClusterLabelIn("table", ["Sales"]))`.
+        """
+        node_mask = np.asarray(predicate.mask(self), dtype=bool)
+        codes, sources, targets = self._endpoint_codes
+
+        # one slot per distinct id, plus a last one that -1 endpoints index
+        selected = np.zeros(codes.max(initial=-1) + 2, dtype=bool)
+        selected[codes[node_mask]] = True
+        edge_mask = selected[sources] & selected[targets]
+        return Selection(self, node_mask, edge_mask)
+
+    def lineage(self, node_ids) -> tuple:
+        """
+        Nodes and (source, target) edges on any complete path through `node_ids`.
+        """
+        if isinstance(node_ids, str):
+            node_ids = [node_ids]
+        if self.lineage_index is not None:
+            return self.lineage_index.lineage(node_ids)
+        if self.backend == "csr":
+            return self.csr.lineage(node_ids)
+        return lineage(self.g, node_ids)
+
+    def upstream(self, node_ids) -> set:
+        """
+        Ids of the nodes that reach any of `node_ids`, including themselves.
+        """
+        if self.lineage_index is not None:
+            return self.lineage_index.upstream(node_ids)
+        if self.backend == "csr":
+            return self.csr.upstream(node_ids)
+        return upstream(self.g, node_ids)
+
+    def downstream(self, node_ids) -> set:
+        """
+        Ids of the nodes reachable from any of `node_ids`, including themselves.
+        """
+        if self.lineage_index is not None:
+            return self.lineage_index.downstream(node_ids)
+        if self.backend == "csr":
+            return self.csr.downstream(node_ids)
+        return downstream(self.g, node_ids)
+
+    def adjacency(self) -> dict:
+        if self.backend == "csr":
+            return self.csr.adjacency()
+        return csr_adjacency(self.g)
+
+    def diff(self, nodes: pd.DataFrame, edges: pd.DataFrame, clusters: dict = None) -> GraphDiff:
+        """
+        Changes that turn this graph into the one built from `nodes`, `edges`
+        and `clusters`.
+        """
+        return diff_tables(self.nodes, self.edges, nodes, edges, self.clusters, clusters)
+
+    def apply_diff(self, diff: GraphDiff):
+        """
+        Apply `diff` in place. Only the nodes it touches get their degree
+        flags and attributes recomputed, and the lineage index is updated
+        around the changed edges instead of being rebuilt. Properties not
+        computed yet are left to be derived on first use. The node and edge
+        frames are replaced rather than modified, so frames handed out
+        before stay consistent.
+        """
+        nodes = self.nodes
+        if diff.removed_nodes:
+            nodes = nodes[~nodes["id"].isin(diff.removed_nodes)]
+        if len(diff.removed_placements):
+            nodes = nodes[~placements(nodes).isin(placements(diff.removed_placements)).to_numpy()]
+        nodes = nodes.copy()
+        if len(diff.updated_nodes):
+            # rows are updated per placement, or every row of an id given
+            # without a parent
+            by_parent = "parent" in diff.updated_nodes.columns
+            keys = placements(nodes, by_parent)
+            updated = diff.updated_nodes.set_axis(placements(diff.updated_nodes, by_parent))
+            is_updated = keys.isin(updated.index).to_numpy()
+            for column in updated.columns:
+                nodes.loc[is_updated, column] = keys[is_updated].map(updated[column]).to_numpy()
+        if len(diff.added_nodes):
+            nodes = pd.concat([nodes, diff.added_nodes], ignore_index=True)
+
+        edges = self.edges
+        if len(diff.removed_edges):
+            edges = edges[~edges["id"].isin(diff.removed_edges["id"])]
+        if len(diff.added_edges):
+            edges = pd.concat([edges, diff.added_edges], ignore_index=True)
+
+        touched = diff.touched
+        if self.backend == "csr":
+            # the arrays are immutable, they are rebuilt from the edge frame
+            # in one vectorized pass
+            self.csr = CSRGraph.from_edges(edges["source"], edges["target"])
+            self._g = None
+        else:
+            self._apply_edge_changes(diff, touched)
+        structure = self.structure
+
+        # derived properties already computed are patched for the touched
+        # nodes, the others stay lazy
+        touched_rows = nodes[nodes["id"].isin(list(touched))]
+        present = set(touched_rows["id"])
+        for name, degree in [("roots", structure.in_degree), ("leaves", structure.out_degree)]:
+            if name not in self._memo:
+                continue
+            ids = set(self._memo[name])
+            for node_id in touched:
+                if node_id in present and (node_id not in structure or degree(node_id) == 0):
+                    ids.add(node_id)
+                else:
+                    ids.discard(node_id)
+            self._memo[name] = ids
+
+        if "attributes" in self._memo:
+            attributes = dict(self._memo["attributes"])
+            for node_id in diff.removed_nodes:
+                attributes.pop(node_id, None)
+            rows = touched_rows.drop_duplicates(subset=["id"]).set_index("id", drop=False)
+            attributes.update(rows.to_dict("index"))
+            self._memo["attributes"] = attributes
+
+        if "positions" in self._memo:
+            # nodes that stay keep their position, new ones are placed next to them
+            positions = self._memo["positions"].drop(diff.removed_nodes, errors="ignore")
+            self._memo["positions"] = place(nodes["id"], edges, positions)
+
+        for name in list(self._memo):
+            if name not in ["roots", "leaves", "attributes", "lineage_index", "positions"]:
+                del self._memo[name]
+
+        self.nodes = nodes
+        self.edges = edges
+        if diff.clusters is not None:
+            self.clusters = diff.clusters
+
+    def _apply_edge_changes(self, diff: GraphDiff, touched: set):
+        index = self._memo.get("lineage_index")
+
+        removed_edges = list(zip(diff.removed_edges["source"], diff.removed_edges["target"]))
+        self.g.remove_edges_from(removed_edges)
+        if index is not None:
+            index.remove_edges(removed_edges)
+
+        for source, target in zip(diff.added_edges["source"], diff.added_edges["target"]):
+            self.g.add_edge(source, target)
+            # an edge closing a cycle leaves lineage queries to graph traversal
+            if index is not None and not index.add_edge(source, target):
+                index = None
+
+        # the graph only holds nodes with edges, as when it is built from scratch
+        isolated = [n for n in touched if n in self.g and self.g.degree(n) == 0]
+        self.g.remove_nodes_from(isolated)
+        if index is not None:
+            for node_id in isolated:
+                index.remove_node(node_id)
+            if len(index) > self._lineage_index_max_nodes:
+                index = None
+        if "lineage_index" in self._memo:
+            self._memo["lineage_index"] = index
+
+    def add_nodes(self, nodes: pd.DataFrame):
+        """
+        Add `nodes` in place. Rows whose id, and parent if they have one,
+        are already in the graph update that row instead.
+        """
+        keys = placements(nodes)
+        nodes, keys = nodes[~keys.duplicated().to_numpy()], keys[~keys.duplicated()]
+        # look the few new rows up in the graph, not the other way around
+        candidates = self.nodes[self.nodes["id"].isin(nodes["id"])]
+        exists = keys.isin(placements(candidates, "parent" in nodes.columns)).to_numpy()
+        self.apply_diff(
+            GraphDiff(added_nodes=nodes[~exists], updated_nodes=nodes[exists])
+        )
+
+    def remove_nodes(self, node_ids: list):
+        """
+        Remove the nodes `node_ids` and their edges in place.
+        """
+        node_ids = list(node_ids)
+        is_attached = self.edges["source"].isin(node_ids) | self.edges["target"].isin(node_ids)
+        self.apply_diff(
+            GraphDiff(
+                removed_nodes=self.nodes.loc[self.nodes["id"].isin(node_ids), "id"].unique().tolist(),
+                removed_edges=self.edges.loc[is_attached, EDGE_COLUMNS],
+            )
+        )
+
+    def add_edges(self, edges: pd.DataFrame):
+        """
+        Add the source and target pairs of `edges` in place, edges already
+        in the graph are skipped.
+        """
+        edges = edges[["source", "target"]].assign(id=edge_ids(edges)).drop_duplicates(subset=["id"])
+        known = self.edges.loc[self.edges["id"].isin(edges["id"]), "id"]
+        self.apply_diff(GraphDiff(added_edges=edges[~edges["id"].isin(known)]))
+
+    def remove_edges(self, edge_ids: list):
+        """
+        Remove the edges `edge_ids`, e.g. ["A->B"], in place.
+        """
+        removed = self.edges[self.edges["id"].isin(list(edge_ids))].drop_duplicates(subset=["id"])
+        self.apply_diff(GraphDiff(removed_edges=removed[EDGE_COLUMNS]))
+
     def _modify_graph(func):
         """
         Decorator to wrap methods that modify the graph, ensuring properties are recalculated.
@@ -190,65 +593,60 @@ class Graph:
         elements = clusters + nodes_elements + edges_elements
         return Elements(elements=elements)
 
-    def select_elements(self, selected_types, selected_locations) -> list:
-        # TODO: Implement this method
-        filtered_nodes = self.nodes[
-            [
-                node["type"] in selected_types
-                and node["location"] in selected_locations
-                for idx, node in self.nodes.iterrows()
-            ]
-        ]
-
-        filtered_edges = self.edges[
-            self.edges["source"].isin(filtered_nodes["id"])
-            & self.edges["target"].isin(filtered_nodes["id"])
+    def export_records(self, validate_sample: bool = False, positions: pd.DataFrame = None) -> list:
+        """
+        Fast equivalent of `export_elements().model_dump()["elements"]` that
+        builds the element dicts from the columns directly. Elements are not
+        validated, unless `validate_sample` checks the first node and edge.
+        Nodes are given the `positions` of e.g. `Graph.positions`, if any.
+        """
+        clusters = [
+            {
+                "data": {
+                    "id": item["id"],
+                    "label": item["label"],
+                    "type": item["type"],
+                    "parent": item.get("parent", None),
+                },
+                "classes": k,
+            }
+            for k, v in (self.clusters or {}).items()
+            for item in v
         ]
 
-        return self._export_elements(filtered_nodes, filtered_edges)
+        _nodes = self._transform_nodes(self.nodes)
+        _edges = self._transform_edges(self.edges)
 
-    @_modify_graph
-    def select_related_elements(self, selected_cluster: str, selected_values: list, copy=False) -> Self:
-        # get cluster data
-        df = pd.DataFrame(self.clusters[selected_cluster]).rename(columns={"id": selected_cluster, "label": f"{selected_cluster}_label"})
-        
-        merged_nodes = self.nodes.merge(df[[selected_cluster, f"{selected_cluster}_label"]], left_on=selected_cluster, right_on=selected_cluster, how="left")
-        
+        nodes_elements = Elements.node_records(_nodes, positions)
+        edges_elements = Elements.edge_records(_edges)
 
-        filtered_nodes = merged_nodes[
-            [
-                node[f"{selected_cluster}_label"] in selected_values
-                for idx, node in merged_nodes.iterrows()
-            ]
-        ]
+        if validate_sample:
+            for sample in nodes_elements[:1] + edges_elements[:1]:
+                Element.model_validate(sample)
 
-        # Get the list of nodes and edges to highlight
-        nodes_to_filtered = set()
-        edges_to_filtered = set()
+        return clusters + nodes_elements + edges_elements
 
-        # Find all paths that include the selected node
-        for node_id in filtered_nodes["id"]:
-            paths = self.mapping_node_to_path.get(node_id, [])
+    def select_elements(self, selected_types, selected_locations) -> list:
+        selection = self.select(
+            Isin("type", selected_types) & Isin("location", selected_locations)
+        )
+        return self._export_elements(selection.nodes, selection.edges)
 
-            for path in paths:
-                nodes_to_filtered.update(path)
-                edges_in_path = list(zip(path[:-1], path[1:]))
-                edges_to_filtered.update(edges_in_path)
+    @_modify_graph
+    def select_related_elements(self, selected_cluster: str, selected_values: list, copy=False) -> Self:
+        filtered = self.cluster_members(selected_cluster, labels=selected_values)
 
-        related_nodes = self.nodes[self.nodes["id"].isin(nodes_to_filtered)]
-        related_nodes = related_nodes.copy()
+        # Get the nodes on any path through the selected nodes
+        nodes_to_filtered, _ = self.lineage(filtered)
 
-        related_edges = self.edges[
-            self.edges["source"].isin(nodes_to_filtered)
-            & self.edges["target"].isin(nodes_to_filtered)
-        ]
-        related_edges = related_edges.copy()
+        related = self.select(Isin("id", nodes_to_filtered))
+        related_nodes = related.nodes.copy()
+        related_edges = related.edges.copy()
 
         if copy:
             # Return a new instance of Graph with updated nodes
             # new_graph = Graph(nodes=related_nodes[["id", "label", "type", "source", "location"]], edges=related_edges)
-            new_graph = Graph(related_nodes, related_edges, self.clusters)
-            return new_graph
+            return self._copy(related_nodes, related_edges, self.clusters)
         else:
             # Modify the current instance
             self.nodes = related_nodes
@@ -258,74 +656,20 @@ class Graph:
         return None
 
     @_modify_graph
-    def group_by(self, group_by: str, type: str, copy=False) -> dict:
-        # get cluster data
-        df = pd.DataFrame(self.clusters[group_by]).rename(columns={"id": group_by, "label": f"{group_by}_label", "parent": f"{group_by}_parent"})
-        
-        # transform nodes to group_by if type is met
-        merged_nodes = self.nodes.merge(df[[group_by, f"{group_by}_label", f"{group_by}_parent"]], left_on=group_by, right_on=group_by, how="left")
-        
-        _grouped_nodes = merged_nodes.copy()
-        # TODO: type can be replaced by not nan
-        _grouped_nodes["id"] = merged_nodes[group_by].where(
-            merged_nodes["type"] == type, merged_nodes["id"]
-        )
-        _grouped_nodes["label"] = _grouped_nodes[f"{group_by}_label"].where(
-            _grouped_nodes["type"] == type, _grouped_nodes["label"]
-        )
-        _grouped_nodes["parent"] = _grouped_nodes[f"{group_by}_parent"].where(
-            _grouped_nodes["type"] == type, _grouped_nodes["parent"]
-        )
-
-        # remove duplicates
-        _grouped_nodes = _grouped_nodes.drop_duplicates(subset=["id"])
-        _grouped_nodes = _grouped_nodes.copy()
-
-        # transform nodes in edges to group_by if type is met
-        _grouped_edges = self.edges.copy()
-        _grouped_edges["source"] = _grouped_edges["source"].map(
-            lambda x: (
-                merged_nodes[merged_nodes["id"] == x][group_by].values[0]
-                if merged_nodes[merged_nodes["id"] == x]["type"].values[0] == type
-                else x
-            )
-        )
-
-        _grouped_edges["target"] = _grouped_edges["target"].map(
-            lambda x: (
-                merged_nodes[merged_nodes["id"] == x][group_by].values[0]
-                if merged_nodes[merged_nodes["id"] == x]["type"].values[0] == type
-                else x
-            )
-        )
-        _grouped_edges["id"] = (
-            _grouped_edges["source"] + "->" + _grouped_edges["target"]
-        )
-
-        # remove duplicates
-        _grouped_edges = _grouped_edges.drop_duplicates(subset=["id"])
-        # remove edges that have the same source and target
-        _grouped_edges = _grouped_edges[
-            _grouped_edges["source"] != _grouped_edges["target"]
-        ]
-        _grouped_edges = _grouped_edges.copy()
-
-        # remove extra clusters
-        clusters = self.clusters
-        clusters.pop(group_by)
-        if group_by == "dataset":
-            clusters.pop("table")
-        if group_by == "report":
-            clusters.pop("page")
-
+    def group(self, groupings: dict, copy=False) -> Self:
+        """
+        Collapse nodes into their clusters, e.g. {"measure": "dataset", "visual": "page"}
+        groups measures by dataset and visuals by page in a single pass.
+        """
+        nodes, edges, clusters = self.rollup.tables(groupings)
         if copy:
-            # Return a new instance of Graph with updated nodes
-            new_graph = Graph(nodes=_grouped_nodes, edges=_grouped_edges, clusters=clusters)
-            return new_graph
+            return self._copy(nodes, edges, clusters)
         else:
             # Modify the current instance
-            self.nodes = _grouped_nodes
-            self.edges = _grouped_edges
+            self.nodes = nodes
+            self.edges = edges
             self.clusters = clusters
-            # Note: Edges might need re-evaluation depending on how grouping affects connectivity
         return None
+
+    def group_by(self, group_by: str, type: str, copy=False) -> Self:
+        return self.group({type: group_by}, copy=copy)
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+EDGE_COLUMNS = ["source", "target", "id"]
+
+
+@dataclass
+class GraphDiff:
+    """
+    Nodes and edges to add, remove or update to turn one version of a graph
+    into the next. Node frames hold the new rows, edge frames hold source,
+    target and id. `removed_nodes` are the ids left without any row,
+    `removed_placements` the id and parent of the other rows removed, e.g.
+    a visual taken off one of its two pages.
+    """
+
+    added_nodes: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["id"]))
+    removed_nodes: list = field(default_factory=list)
+    removed_placements: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["id", "parent"]))
+    updated_nodes: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["id"]))
+    added_edges: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=EDGE_COLUMNS))
+    removed_edges: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=EDGE_COLUMNS))
+    clusters: dict = None
+    clusters_changed: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return not (
+            len(self.added_nodes)
+            or self.removed_nodes
+            or len(self.removed_placements)
+            or len(self.updated_nodes)
+            or len(self.added_edges)
+            or len(self.removed_edges)
+            or self.clusters_changed
+        )
+
+    @property
+    def touched(self) -> set:
+        """
+        Ids of the nodes whose attributes or edges changed.
+        """
+        touched = set(self.added_nodes["id"]) | set(self.removed_nodes) | set(self.updated_nodes["id"])
+        touched.update(self.removed_placements["id"])
+        for edges in [self.added_edges, self.removed_edges]:
+            touched.update(edges["source"])
+            touched.update(edges["target"])
+        return touched
+
+
+# keys are compared as object arrays, isin looks those up in a hash table
+# while it converts every value it is given to a scalar for pyarrow strings
+
+
+def edge_ids(edges: pd.DataFrame) -> pd.Series:
+    return (edges["source"].astype(str) + "->" + edges["target"].astype(str)).astype(object)
+
+
+def placements(nodes: pd.DataFrame, by_parent: bool = True) -> pd.Series:
+    """
+    Key of every node row: its id and parent, or only its id without a
+    parent column or `by_parent`. A node listed under several parents has
+    one row, and one key, per parent.
+    """
+    ids = nodes["id"].astype(str)
+    if not by_parent or "parent" not in nodes.columns:
+        return ids.astype(object)
+    return (ids + "\0" + nodes["parent"].astype(object).fillna("").astype(str)).astype(object)
+
+
+def diff_tables(
+    old_nodes: pd.DataFrame,
+    old_edges: pd.DataFrame,
+    nodes: pd.DataFrame,
+    edges: pd.DataFrame,
+    old_clusters: dict = None,
+    clusters: dict = None,
+) -> GraphDiff:
+    """
+    Compare the node and edge tables of two versions of a graph, node rows
+    by their id and parent, edges by id.
+    """
+    old_keys, new_keys = placements(old_nodes), placements(nodes)
+    old_rows = old_nodes.set_axis(old_keys)[~old_keys.duplicated().to_numpy()]
+    new_rows = nodes.set_axis(new_keys)[~new_keys.duplicated().to_numpy()]
+
+    is_added = ~new_rows.index.isin(old_rows.index)
+    is_removed = ~old_rows.index.isin(new_rows.index)
+
+    # rows present in both versions, aligned by key, with missing values made comparable
+    columns = [column for column in new_rows.columns if column != "id"]
+    kept = new_rows[~is_added]
+    before = old_rows[~is_removed].reindex(index=kept.index, columns=columns)
+    after = kept[columns]
+    changed = (before.astype(object).fillna("\0") != after.astype(object).fillna("\0")).any(axis=1)
+
+    # removed rows either take the last placement of a node, or one of several
+    removed = old_rows[is_removed]
+    is_gone = ~removed["id"].astype(object).isin(new_rows["id"])
+
+    new_edges = edges[["source", "target"]].assign(id=edge_ids(edges)).drop_duplicates(subset=["id"])
+    old_edges = old_edges[["source", "target"]].assign(id=edge_ids(old_edges)).drop_duplicates(subset=["id"])
+
+    return GraphDiff(
+        added_nodes=new_rows[is_added].reset_index(drop=True),
+        removed_nodes=removed.loc[is_gone, "id"].unique().tolist(),
+        removed_placements=removed[~is_gone.to_numpy()].reindex(columns=["id", "parent"]).reset_index(drop=True),
+        updated_nodes=kept[changed.to_numpy()].reset_index(drop=True),
+        added_edges=new_edges[~new_edges["id"].isin(old_edges["id"])].reset_index(drop=True),
+        removed_edges=old_edges[~old_edges["id"].isin(new_edges["id"])].reset_index(drop=True),
+        clusters=clusters,
+        clusters_changed=clusters is not None and clusters != old_clusters,
+    )
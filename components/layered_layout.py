@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from components.csr_graph import _compress
+
+# same spacing as the klay layout the browser used to run
+RANK_SEP = 100
+NODE_SEP = 50
+# alternating down and up barycenter sweeps
+SWEEPS = 4
+
+
+def _edge_positions(indptr: np.ndarray, nodes: np.ndarray):
+    # positions in the CSR arrays of the edges of `nodes`, and their owner
+    starts, lengths = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum()), np.repeat(nodes, lengths)
+
+
+def longest_path_ranks(num_nodes: int, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Layer of every node, one more than its deepest predecessor, computed
+    one topological frontier at a time. Nodes on a cycle keep the rank
+    reached through their predecessors outside of it.
+    """
+    indptr, indices = _compress(sources, targets, num_nodes)
+    remaining = np.bincount(targets, minlength=num_nodes)
+    rank = np.zeros(num_nodes, dtype=np.int64)
+
+    frontier = np.flatnonzero(remaining == 0)
+    while frontier.size:
+        positions, owners = _edge_positions(indptr, frontier)
+        successors = indices[positions]
+        np.maximum.at(rank, successors, rank[owners] + 1)
+        np.subtract.at(remaining, successors, 1)
+        frontier = np.unique(successors[remaining[successors] == 0])
+    return rank
+
+
+def _order(rank: np.ndarray, key: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    # position of every node within its layer, sorted by the mean key of its
+    # group first so that nodes of a cluster stay next to each other
+    codes, _ = pd.factorize(rank * (groups.max() + 1) + groups)
+    group_key = np.bincount(codes, weights=key) / np.bincount(codes)
+    order = np.lexsort((key, group_key[codes], rank))
+
+    layer_start = np.concatenate([[0], np.cumsum(np.bincount(rank))])
+    position = np.empty(len(rank), dtype=np.float64)
+    position[order] = np.arange(len(rank)) - layer_start[rank[order]]
+    return position
+
+
+def _barycenters(position: np.ndarray, neighbors: np.ndarray, owners: np.ndarray) -> np.ndarray:
+    # mean position of the neighbors of every node, its own position when it has none
+    counts = np.bincount(owners, minlength=len(position))
+    sums = np.bincount(owners, weights=position[neighbors], minlength=len(position))
+    return np.where(counts > 0, sums / np.maximum(counts, 1), position)
+
+
+def layered_positions(nodes: pd.DataFrame, edges: pd.DataFrame, sweeps: int = SWEEPS) -> pd.DataFrame:
+    """
+    Left to right layered (Sugiyama style) layout of the nodes, as x and y
+    columns indexed by node id.
+
+    Nodes are layered by longest path, ordered within layers by barycenter
+    sweeps and spread evenly around the middle of their layer. Edges that
+    span several layers are not split into dummy nodes, the sweeps use the
+    position of their far end directly.
+    """
+    first = nodes.drop_duplicates(subset=["id"])
+    ids = first["id"].to_numpy(dtype=object)
+    index = pd.Index(ids)
+    if not len(ids):
+        return pd.DataFrame({"x": [], "y": []}, index=index)
+
+    sources = index.get_indexer(edges["source"])
+    targets = index.get_indexer(edges["target"])
+    keep = (sources >= 0) & (targets >= 0) & (sources != targets)
+    sources, targets = sources[keep], targets[keep]
+    rank = longest_path_ranks(len(ids), sources, targets)
+
+    # nodes of the same parent are kept together, nodes without one alone
+    parents, uniques = pd.factorize(first["parent"])
+    groups = np.where(parents >= 0, parents, len(uniques) + np.arange(len(ids)))
+
+    position = _order(rank, np.arange(len(ids), dtype=np.float64), groups)
+    for sweep in range(sweeps):
+        # down sweeps look at predecessors, up sweeps at successors
+        neighbors, owners = (sources, targets) if sweep % 2 == 0 else (targets, sources)
+        position = _order(rank, _barycenters(position, neighbors, owners), groups)
+
+    layer_size = np.bincount(rank)
+    return pd.DataFrame(
+        {
+            "x": rank * float(RANK_SEP),
+            "y": (position - (layer_size[rank] - 1) / 2) * NODE_SEP,
+        },
+        index=index,
+    )
+
+
+def cluster_positions(nodes: pd.DataFrame, positions: pd.DataFrame, levels: list) -> pd.DataFrame:
+    """
+    Centroid of the positions of the member nodes of every cluster of
+    `levels`, as x and y columns indexed by cluster id.
+    """
+    xy = positions.reindex(nodes["id"]).reset_index(drop=True)
+    frames = [xy.groupby(nodes[level].to_numpy()).mean() for level in levels if level in nodes.columns]
+    if not frames:
+        return pd.DataFrame({"x": [], "y": []})
+    centroids = pd.concat(frames)
+    return centroids[~centroids.index.duplicated()]
+
+
+def _neighbor_guess(missing: pd.Index, edges: pd.DataFrame, known: pd.DataFrame) -> pd.DataFrame:
+    # one layer after the placed predecessors, or else one layer before the
+    # placed successors, at the mean height of those neighbors
+    guesses = []
+    for node, neighbor, step, pick in [("target", "source", RANK_SEP, "max"), ("source", "target", -RANK_SEP, "min")]:
+        links = edges[edges[node].isin(missing) & edges[neighbor].isin(known.index)]
+        xy = known.reindex(links[neighbor]).set_axis(links[node].to_numpy())
+        grouped = xy.groupby(level=0)
+        guesses.append(pd.DataFrame({"x": grouped["x"].agg(pick) + step, "y": grouped["y"].mean()}))
+    guess = pd.concat(guesses)
+    return guess[~guess.index.duplicated()]
+
+
+def place(ids, edges: pd.DataFrame, fixed: pd.DataFrame, seeds: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Positions of the nodes `ids`, reusing `fixed` for the nodes it has. The
+    others start from `seeds`, e.g. the centroid of a collapsed cluster,
+    else next to their placed neighbors, and are moved to the closest free
+    slot of their layer. The work is a lookup per node plus a few steps per
+    node that has to be placed.
+    """
+    ids = pd.Index(pd.unique(np.asarray(ids, dtype=object)))
+    positions = fixed.reindex(ids)
+    is_missing = positions["x"].isna().to_numpy()
+    if not is_missing.any():
+        return positions
+
+    missing = ids[is_missing]
+    guess = seeds.reindex(missing) if seeds is not None else pd.DataFrame(index=missing, columns=["x", "y"])
+    unseeded = guess.index[guess["x"].isna()]
+    if len(unseeded):
+        guess.update(_neighbor_guess(unseeded, edges, positions[~is_missing]))
+    # nodes without any placed neighbor get a layer of their own at the end
+    last = positions["x"].max()
+    guess["x"] = guess["x"].fillna(0.0 if last != last else last + RANK_SEP)
+    guess["y"] = guess["y"].fillna(0.0)
+    guess["x"] = (guess["x"].astype(float) / RANK_SEP).round() * RANK_SEP
+
+    # slots of half a node apart, a node takes the slots next to its own
+    placed = positions[~is_missing]
+    placed = placed[placed["x"].isin(set(guess["x"]))]
+    occupied = {}
+    for x, y in zip(placed["x"].tolist(), placed["y"].tolist()):
+        occupied.setdefault(x, set()).add(round(2 * y / NODE_SEP))
+
+    guess = guess.sort_values(["x", "y"])
+    heights = []
+    for x, y in zip(guess["x"].tolist(), guess["y"].tolist()):
+        slots = occupied.setdefault(x, set())
+        slot = round(2 * y / NODE_SEP)
+        # the closest free slot, alternating below and above
+        for step in range(len(slots) * 2 + 1):
+            candidate = slot + (step + 1) // 2 * 2 * (1 if step % 2 else -1)
+            if not slots & {candidate - 1, candidate, candidate + 1}:
+                break
+        slots.add(candidate)
+        heights.append(candidate * NODE_SEP / 2)
+
+    positions.loc[guess.index, "x"] = guess["x"].to_numpy()
+    positions.loc[guess.index, "y"] = heights
+    return positions
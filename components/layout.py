@@ -1,17 +1,43 @@
-from dash import html, dcc
+import os
+
+from dash import dash_table, html, dcc
 import dash_bootstrap_components as dbc
 import dash_cytoscape as cyto
 
 from assets.stylesheet import default_stylesheet, SIDEBAR_STYLE
-from components.cytoscape import Elements
-from components.nodes_model import Nodes
-from services.data_loader import load_data
+from components.node_table import COLUMNS, DEPENDENCY_COLUMNS
+from services.data_provider import DATA_RELOAD_INTERVAL, data_provider
+from services.graph_cache import ELEMENT_BUDGET, LAYOUT_MODE, fit_groupings, view_adjacency, view_patch
+from services.model_cache import ModelTables
 
 cyto.load_extra_layouts()
 
+# "client" walks the lineage in the browser (assets/lineage.js) from an
+# adjacency payload sent once per view, "server" asks highlight_paths on
+# every tap
+HIGHLIGHT_MODE = os.environ.get("HIGHLIGHT_MODE", "client")
+
+# seconds between checks of each page for reloaded data
+DATA_POLL_INTERVAL = float(os.environ.get("DATA_POLL_INTERVAL", 10))
+
+# rows per page of the node and dependency tables, pages are cut on the server
+TABLE_PAGE_SIZE = int(os.environ.get("TABLE_PAGE_SIZE", 20))
+
+
+if LAYOUT_MODE in ["incremental", "server"]:
+    # nodes come with the positions of components.layered_layout
+    CYTOSCAPE_LAYOUT = {"name": "preset", "fit": True, "padding": 30}
+else:
+    CYTOSCAPE_LAYOUT = {
+        "name": "klay",
+        "rankDir": "LR",  # Left to Right
+        "nodeSep": 50,
+        "rankSep": 100,
+    }
+
 
-def get_filter_pane():
-    initial_data = load_data()
+def get_filter_pane(initial_data: dict, groupings: dict = None):
+    groupings = groupings or {}
     types = initial_data["types"]
     tables = initial_data["tables"]
     return html.Div(
@@ -40,7 +66,7 @@ def get_filter_pane():
                                         "value": "default",
                                     },
                                 ],
-                                value="default",
+                                value=groupings.get("measure", "default"),
                                 inline=True,
                             ),
                         ]
@@ -64,7 +90,7 @@ def get_filter_pane():
                                         "value": "default",
                                     },
                                 ],
-                                value="default",
+                                value=groupings.get("visual", "default"),
                                 inline=True,
                             ),
                         ]
@@ -115,34 +141,93 @@ def get_filter_pane():
     )
 
 
+def get_tables():
+    def paged_table(id: str, columns: list, **kwargs):
+        # rows are sliced, sorted and filtered by callbacks.page_tables
+        return dash_table.DataTable(
+            id=id,
+            columns=[{"name": column.title(), "id": column} for column in columns],
+            data=[],
+            page_action="custom",
+            page_current=0,
+            page_size=TABLE_PAGE_SIZE,
+            sort_action="custom",
+            sort_mode="multi",
+            sort_by=[],
+            style_table={"overflowX": "auto"},
+            **kwargs,
+        )
+
+    return dbc.Row(
+        [
+            dbc.Col(
+                [
+                    html.H4("Nodes"),
+                    paged_table("node-table", COLUMNS, filter_action="custom", filter_query=""),
+                ]
+            ),
+            dbc.Col(
+                [
+                    html.H4("Dependencies", id="dependency-title"),
+                    paged_table("dependency-table", DEPENDENCY_COLUMNS),
+                ]
+            ),
+        ],
+        style={"margin-top": "15px"},
+    )
+
+
 def serve_layout():
-    initial_data = load_data()
-    model: Nodes = initial_data["model"]
-    elements: dict = Elements.from_model(model).model_dump()["elements"]
-    
+    # loaded once per process, rendering a page does not parse the data
+    initial_data = data_provider.get()
+    model: ModelTables = initial_data["model"]
+
+    # the model stays on the server, the browser only keeps its key and a
+    # description of the view currently rendered
+    dataset_key = initial_data["key"]
+    groupings = fit_groupings(model, budget=ELEMENT_BUDGET, key=dataset_key)
+    view = {
+        "dataset": dataset_key,
+        "version": initial_data["version"],
+        "table": None,
+        "groupings": groupings,
+        "expanded": [],
+    }
+    # sent encoded, elements.applyPatch decodes them into the cytoscape graph
+    patch = view_patch(None, None, model, view)
+    adjacency = None
+    if HIGHLIGHT_MODE == "client":
+        adjacency = view_adjacency(model, groupings=groupings, key=dataset_key)
 
     return html.Div(
         [
-            dcc.Store(id="initial-data", data=model.model_dump(exclude_none=True), storage_type="memory"),
-            dcc.Store(id="elements", data=elements, storage_type="memory"),
+            dcc.Store(id="elements", data=view, storage_type="memory"),
+            dcc.Store(id="elements-patch", data=patch, storage_type="memory"),
+            dcc.Interval(
+                id="data-poll",
+                interval=DATA_POLL_INTERVAL * 1000,
+                disabled=DATA_RELOAD_INTERVAL <= 0 or DATA_POLL_INTERVAL <= 0,
+            ),
             dcc.Store(id="selected-node", data=None, storage_type="memory"),
+            dcc.Store(id="adjacency", data=adjacency, storage_type="memory"),
+            dcc.Store(id="highlighted", data=None, storage_type="memory"),
+            dcc.Store(id="highlight-applied", data=None, storage_type="memory"),
+            dcc.Store(id="dependency-node", data=None, storage_type="memory"),
             dbc.Row(
                 [
-                    dbc.Col(get_filter_pane()),
+                    dbc.Col(get_filter_pane(initial_data, groupings)),
                     dbc.Col(
-                        cyto.Cytoscape(
-                            id="cytoscape",
-                            elements=elements,
-                            # style={'width': '100%', 'height': '600px'},
-                            layout={
-                                "name": "klay",
-                                "rankDir": "LR",  # Left to Right
-                                "nodeSep": 50,
-                                "rankSep": 100,
-                            },
-                            stylesheet=default_stylesheet,
-                            style={"width": "100%", "height": "600px"},
-                        ),
+                        [
+                            cyto.Cytoscape(
+                                id="cytoscape",
+                                elements=[],
+                                # style={'width': '100%', 'height': '600px'},
+                                layout=CYTOSCAPE_LAYOUT,
+                                stylesheet=default_stylesheet,
+                                style={"width": "100%", "height": "600px"},
+                            ),
+                            get_tables(),
+                        ],
                         width=9,
                         style={
                             "margin-left": "15px",
@@ -0,0 +1,231 @@
+import math
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# columns of the node table, the ones the nodes frame has
+COLUMNS = ["id", "label", "type", "parent"]
+DEPENDENCY_COLUMNS = ["direction", "id", "label", "type"]
+
+# filtered and sorted row orders kept per table, one per filter and sort
+# the tables were asked for
+MAX_ORDERS = 32
+
+# operators of the filter queries of a Dash DataTable, e.g.
+# '{label} icontains "Sales" && {type} s= measure', by the name the table
+# compares with. Any of them may be prefixed with "s" or "i" to compare case
+# sensitively or not, the table's own filter row always sends a prefix.
+OPERATORS = {
+    "=": "=", "eq": "=",
+    "!=": "!=", "ne": "!=",
+    "<": "<", "lt": "<",
+    "<=": "<=", "le": "<=",
+    ">": ">", "gt": ">",
+    ">=": ">=", "ge": ">=",
+    "contains": "contains",
+    "datestartswith": "datestartswith",
+}
+_TERM = re.compile(r"\{(?P<column>[^}]+)\}\s+(?P<operator>\S+)\s+(?P<value>.*)")
+
+
+def parse_filter(filter_query: str) -> list:
+    """
+    (column, operator, value, case) terms of a DataTable filter query. Terms
+    are joined with "&&", values may be quoted. `case` is True or False for
+    operators with an "s" or "i" prefix and None without one, the operator
+    is None when it is not one of OPERATORS.
+    """
+    terms = []
+    for part in (filter_query or "").split(" && "):
+        match = _TERM.fullmatch(part.strip())
+        if not match:
+            continue
+        operator, case = match["operator"], None
+        if operator not in OPERATORS and operator[:1] in ["s", "i"] and operator[1:] in OPERATORS:
+            operator, case = operator[1:], operator[0] == "s"
+        value = match["value"].strip()
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        terms.append((match["column"], OPERATORS.get(operator), value, case))
+    return terms
+
+
+def _matches(values: pd.Index, operator: str, value: str, case: bool = None) -> np.ndarray:
+    # compared as strings, the columns only hold ids and labels
+    values = values.astype(str)
+    if operator is None:
+        # a term that cannot be read matches no row rather than being dropped
+        return np.zeros(len(values), dtype=bool)
+    # without a prefix contains ignores case and the comparisons do not
+    if case is None:
+        case = operator != "contains"
+    if not case:
+        values, value = values.str.lower(), value.lower()
+    if operator == "contains":
+        return np.asarray(values.str.contains(value, regex=False))
+    if operator == "datestartswith":
+        return np.asarray(values.str.startswith(value))
+    compare = {
+        "=": values == value,
+        "!=": values != value,
+        "<": values < value,
+        "<=": values <= value,
+        ">": values > value,
+        ">=": values >= value,
+    }
+    return np.asarray(compare[operator])
+
+
+def _records(rows: pd.DataFrame) -> list:
+    # missing values are sent as null, not NaN
+    return rows.astype(object).where(rows.notna(), None).to_dict("records")
+
+
+class NodeTable:
+    """
+    Node rows of a Graph, one per id, for the paged tables of the explorer.
+
+    Every column is factorized into sorted codes once, so filters compare
+    the distinct values of a column only and sorts are a lexsort of codes.
+    The filtered and sorted order of each query is kept, turning a page is
+    then a slice of it. The dependencies of a node come from the graph's
+    lineage queries and their sorted orders are kept the same way.
+    """
+
+    def __init__(self, graph: "Graph"):
+        self.graph = graph
+        nodes = graph.nodes.drop_duplicates(subset=["id"])
+        self.columns = [column for column in COLUMNS if column in nodes.columns]
+        self.frame = nodes[self.columns].reset_index(drop=True)
+        self._index = pd.Index(self.frame["id"])
+        self._codes = {}
+        self._orders = OrderedDict()
+        self._dependencies = OrderedDict()
+        self._dependency_orders = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    def _factorized(self, column: str) -> tuple:
+        # codes follow the sort order of the values, missing values are last
+        if column not in self._codes:
+            codes, uniques = pd.factorize(self.frame[column], sort=True)
+            self._codes[column] = np.where(codes < 0, len(uniques), codes), pd.Index(uniques)
+        return self._codes[column]
+
+    def _mask(self, filter_query: str) -> np.ndarray:
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, operator, value, case in parse_filter(filter_query):
+            if column not in self.columns:
+                continue
+            codes, uniques = self._factorized(column)
+            # missing values match no term
+            matching = np.append(_matches(uniques, operator, value, case), False)
+            mask &= matching[codes]
+        return mask
+
+    def order(self, filter_query: str = "", sort_by: list = None) -> np.ndarray:
+        """
+        Positions of the rows matching `filter_query`, sorted by `sort_by`,
+        e.g. [{"column_id": "label", "direction": "asc"}].
+        """
+        sort_by = [item for item in sort_by or [] if item["column_id"] in self.columns]
+        key = (filter_query or "", tuple((item["column_id"], item["direction"]) for item in sort_by))
+        if key in self._orders:
+            self._orders.move_to_end(key)
+            return self._orders[key]
+
+        positions = np.flatnonzero(self._mask(filter_query))
+        if sort_by:
+            keys = []
+            for item in reversed(sort_by):
+                codes = self._factorized(item["column_id"])[0][positions]
+                keys.append(-codes if item["direction"] == "desc" else codes)
+            positions = positions[np.lexsort(keys)]
+
+        self._orders[key] = positions
+        if len(self._orders) > MAX_ORDERS:
+            self._orders.popitem(last=False)
+        return positions
+
+    def page(self, page_current: int, page_size: int, filter_query: str = "", sort_by: list = None) -> tuple:
+        """
+        Records of page `page_current` of the rows matching `filter_query`,
+        sorted by `sort_by`, and the number of pages.
+        """
+        positions = self.order(filter_query, sort_by)
+        page_count = max(math.ceil(len(positions) / page_size), 1)
+        start = min(page_current or 0, page_count - 1) * page_size
+        return _records(self.frame.iloc[positions[start : start + page_size]]), page_count
+
+    def dependencies(self, node_id: str) -> pd.DataFrame:
+        """
+        Rows of the nodes upstream and downstream of `node_id`, with a
+        "direction" column, sorted by direction and label.
+        """
+        if node_id in self._dependencies:
+            self._dependencies.move_to_end(node_id)
+            return self._dependencies[node_id]
+
+        frames = []
+        for direction, related in [
+            ("upstream", self.graph.upstream([node_id])),
+            ("downstream", self.graph.downstream([node_id])),
+        ]:
+            positions = self._index.get_indexer(list(related - {node_id}))
+            rows = self.frame.iloc[np.sort(positions[positions >= 0])]
+            frames.append(rows.assign(direction=direction))
+        dependencies = pd.concat(frames).sort_values(["direction", "label"], ascending=[False, True], kind="stable")
+        dependencies = dependencies[[column for column in DEPENDENCY_COLUMNS if column in dependencies.columns]]
+
+        self._dependencies[node_id] = dependencies.reset_index(drop=True)
+        if len(self._dependencies) > MAX_ORDERS:
+            self._dependencies.popitem(last=False)
+        return self._dependencies[node_id]
+
+    def dependency_order(self, node_id: str, sort_by: list = None) -> np.ndarray:
+        """
+        Positions of the rows of `dependencies(node_id)` sorted by `sort_by`.
+        """
+        dependencies = self.dependencies(node_id)
+        sort_by = [item for item in sort_by or [] if item["column_id"] in dependencies.columns]
+        key = (node_id, tuple((item["column_id"], item["direction"]) for item in sort_by))
+        if key in self._dependency_orders:
+            self._dependency_orders.move_to_end(key)
+            return self._dependency_orders[key]
+
+        positions = np.arange(len(dependencies))
+        if sort_by:
+            positions = dependencies.sort_values(
+                [item["column_id"] for item in sort_by],
+                ascending=[item["direction"] == "asc" for item in sort_by],
+                kind="stable",
+            ).index.to_numpy()
+
+        self._dependency_orders[key] = positions
+        if len(self._dependency_orders) > MAX_ORDERS:
+            self._dependency_orders.popitem(last=False)
+        return positions
+
+    def dependency_page(self, node_id: str, page_current: int, page_size: int, sort_by: list = None) -> tuple:
+        """
+        Records of page `page_current` of the dependencies of `node_id`,
+        sorted by `sort_by`, and the number of pages.
+        """
+        positions = self.dependency_order(node_id, sort_by)
+        page_count = max(math.ceil(len(positions) / page_size), 1)
+        start = min(page_current or 0, page_count - 1) * page_size
+        return _records(self.dependencies(node_id).iloc[positions[start : start + page_size]]), page_count
+
+    @property
+    def nbytes(self) -> int:
+        size = self.frame.memory_usage(deep=True).sum()
+        size += sum(codes.nbytes for codes, _ in self._codes.values())
+        size += sum(positions.nbytes for positions in self._orders.values())
+        size += sum(order.nbytes for order in self._dependency_orders.values())
+        return int(size)
@@ -0,0 +1,233 @@
+from itertools import product
+
+import pandas as pd
+
+# levels each node type can be grouped by, as offered by the filter pane
+GROUPINGS = {"measure": ["dataset", "table"], "visual": ["report", "page"]}
+# levels of detail of each node type, from the finest to the coarsest. They
+# stop below workspaces: measures and visuals of a workspace would share its
+# id and merge into one node
+LEVELS = {"measure": ["table", "dataset"], "visual": ["page", "report"]}
+# clusters that disappear once nodes are grouped by a level
+COLLAPSED = {
+    "dataset": ["dataset", "table"],
+    "table": ["table"],
+    "report": ["report", "page"],
+    "page": ["page"],
+}
+
+
+def combinations() -> list:
+    """
+    Every grouping the filter pane can ask for, from {} to one level per type.
+    """
+    options = [[(type, level) for level in [None, *levels]] for type, levels in GROUPINGS.items()]
+    return [{type: level for type, level in choice if level} for choice in product(*options)]
+
+
+class Rollup:
+    """
+    Quotient graphs of a Graph, one per grouping of its measures and visuals.
+    Each node row is mapped to its cluster once per level, grouped graphs are
+    then built from those mappings and kept, so switching between groupings
+    is a lookup.
+
+    Rows are mapped one by one rather than by node id: a node listed under
+    two parents belongs to both groups, and its edges are kept for each.
+    Nodes still shown under several parents, e.g. a visual on two pages when
+    visuals are not grouped, are shown once per parent with the id
+    "<id>@<parent>", in every view including the ungrouped one.
+    """
+
+    def __init__(self, graph: "Graph"):
+        self.graph = graph
+        nodes = graph.nodes
+        clusters = graph.clusters or {}
+
+        self._clusters = {
+            level: pd.DataFrame(items, columns=["id", "label", "parent"]).drop_duplicates(subset=["id"]).set_index("id")
+            for level, items in clusters.items()
+            if level in nodes.columns
+        }
+        self._members = {}
+        for type, levels in GROUPINGS.items():
+            for level in levels:
+                if level in self._clusters:
+                    self._map(type, level)
+        self._views = {}
+        placements = nodes[["id", "parent"]].drop_duplicates()
+        self._has_shared_nodes = bool(placements["id"].duplicated().any())
+
+    def _map(self, type: str, level: str) -> pd.Series:
+        # cluster of every node row of `type` at `level`, missing for other rows
+        if (type, level) not in self._members:
+            if level not in self._clusters:
+                raise KeyError(f"no {level} clusters to group {type} nodes by")
+            nodes = self.graph.nodes
+            self._members[type, level] = nodes[level].where(nodes["type"] == type)
+        return self._members[type, level]
+
+    def tables(self, groupings: dict, expanded=()) -> tuple:
+        """
+        Node and edge frames and the clusters of the graph grouped by
+        `groupings`, e.g. {"measure": "dataset", "visual": "page"}. Clusters
+        in `expanded` are shown with their children one level down instead.
+        """
+        nodes = self.graph.nodes
+        clusters = dict(self.graph.clusters or {})
+        expanded = set(expanded)
+        group, label, parent = nodes["id"], nodes["label"], nodes["parent"]
+
+        for type, level in groupings.items():
+            members = self._map(type, level)
+            is_member = members.notna()
+            group = group.mask(is_member, members)
+            label = label.mask(is_member, members.map(self._clusters[level]["label"]))
+            parent = parent.mask(is_member, members.map(self._clusters[level]["parent"]))
+
+            if expanded:
+                finer = LEVELS[type][: LEVELS[type].index(level)] if level in LEVELS[type] else []
+                for child_level in reversed(finer):
+                    is_open = is_member & group.isin(expanded)
+                    if not is_open.any():
+                        break
+                    children = self._map(type, child_level)
+                    group = group.mask(is_open, children)
+                    label = label.mask(is_open, children.map(self._clusters[child_level]["label"]))
+                    parent = parent.mask(is_open, children.map(self._clusters[child_level]["parent"]))
+                # rows of an expanded cluster of the finest level are shown as themselves
+                is_open = is_member & group.isin(expanded)
+                group = group.mask(is_open, nodes["id"])
+                label = label.mask(is_open, nodes["label"])
+                parent = parent.mask(is_open, nodes["parent"])
+
+            # expanded clusters stay as the compound nodes of their children
+            for collapsed in COLLAPSED[level]:
+                kept = [item for item in clusters.pop(collapsed, []) if item["id"] in expanded]
+                if kept:
+                    clusters[collapsed] = kept
+
+        # ids shown under several parents are qualified by each of them, the
+        # edges below then move to every copy
+        placements = pd.DataFrame({"group": group, "parent": parent}).drop_duplicates()
+        is_shared = group.isin(placements.loc[placements["group"].duplicated(), "group"])
+        if is_shared.any():
+            group = group.mask(is_shared, group + "@" + parent.fillna(""))
+
+        grouped_nodes = nodes.assign(id=group, label=label, parent=parent).drop_duplicates(subset=["id"])
+
+        # edge endpoints move to every group of their node, or stay as they are
+        # when they have no node row
+        groups = pd.DataFrame({"node": nodes["id"], "group": group}).drop_duplicates()
+        grouped_edges = self.graph.edges.drop(columns=["id"], errors="ignore")
+        for column in ["source", "target"]:
+            grouped_edges = grouped_edges.merge(groups, left_on=column, right_on="node", how="left")
+            grouped_edges[column] = grouped_edges.pop("group").fillna(grouped_edges[column])
+            grouped_edges = grouped_edges.drop(columns=["node"])
+
+        # edges between the same groups are merged, weighted by the number of
+        # edges they stand for
+        grouped_edges = grouped_edges.groupby(["source", "target"], sort=False, dropna=False).size()
+        grouped_edges = grouped_edges.rename("weight").reset_index()
+        grouped_edges = grouped_edges[grouped_edges["source"] != grouped_edges["target"]]
+        grouped_edges = grouped_edges.assign(id=grouped_edges["source"] + "->" + grouped_edges["target"])
+        return grouped_nodes.reset_index(drop=True), grouped_edges.reset_index(drop=True), clusters
+
+    def view(self, groupings: dict) -> "Graph":
+        """
+        Graph grouped by `groupings`, built on first use. The graph itself is
+        its own view without groupings, unless it has nodes under several
+        parents.
+        """
+        if not groupings and not self._has_shared_nodes:
+            return self.graph
+        key = tuple(sorted(groupings.items()))
+        if key not in self._views:
+            self._views[key] = self.graph._copy(*self.tables(dict(key)))
+        return self._views[key]
+
+    def detail(self, groupings: dict, expanded=()) -> "Graph":
+        """
+        View of `groupings` with the clusters in `expanded` opened. Views
+        with expanded clusters are not kept.
+        """
+        if not expanded:
+            return self.view(groupings)
+        return self.graph._copy(*self.tables(groupings, expanded))
+
+    def _cuts(self, groupings: dict = None) -> list:
+        # uniform levels of detail no finer than `groupings`, finest first
+        groupings = groupings or {}
+        start = {
+            type: levels.index(groupings[type]) + 1 if type in groupings else 0 for type, levels in LEVELS.items()
+        }
+        cuts = []
+        for step in range(max(len(levels) for levels in LEVELS.values()) + 1):
+            cut = {
+                type: levels[max(step, start[type]) - 1]
+                for type, levels in LEVELS.items()
+                if max(step, start[type]) > 0
+            }
+            if all(level in self._clusters for level in cut.values()) and cut not in cuts:
+                cuts.append(cut)
+        return cuts
+
+    def fit(self, budget: int, groupings: dict = None) -> dict:
+        """
+        Finest grouping, no finer than `groupings`, whose view has at most
+        `budget` elements, or the coarsest one if none fits. Its view is then
+        cut down to the budget by `capped`.
+        """
+        cuts = self._cuts(groupings) or [dict(groupings or {})]
+        for cut in cuts:
+            if self.view(cut).num_elements <= budget:
+                return cut
+        return cuts[-1]
+
+    def capped(self, view: "Graph", budget: int) -> "Graph":
+        """
+        `view` cut down to `budget` elements. Edges are kept by weight, the
+        number of edges of the graph they stand for, heaviest first. When
+        the nodes alone are over budget the nodes with the heaviest edges
+        are kept, clusters always are.
+        """
+        nodes, edges = view.nodes, view.edges
+        weight = edges["weight"] if "weight" in edges.columns else pd.Series(1, index=edges.index)
+        num_clusters = sum(len(items) for items in (view.clusters or {}).values())
+
+        if len(nodes) + num_clusters > budget:
+            degree = weight.groupby(edges["source"]).sum().add(weight.groupby(edges["target"]).sum(), fill_value=0)
+            heaviest = nodes["id"].map(degree).fillna(0).sort_values(ascending=False, kind="stable")
+            nodes = nodes.loc[heaviest.index[: max(budget - num_clusters, 0)].sort_values()]
+            is_kept = edges["source"].isin(nodes["id"]) & edges["target"].isin(nodes["id"])
+            edges, weight = edges[is_kept], weight[is_kept]
+
+        max_edges = max(budget - len(nodes) - num_clusters, 0)
+        kept = weight.sort_values(ascending=False, kind="stable").index[:max_edges].sort_values()
+        return self.graph._copy(nodes.reset_index(drop=True), edges.loc[kept].reset_index(drop=True), view.clusters)
+
+    def descendants(self, cluster_id: str) -> set:
+        """
+        Ids of the clusters nested in `cluster_id`, at any depth.
+        """
+        found, frontier = set(), {cluster_id}
+        while frontier:
+            frontier = {
+                id
+                for clusters in self._clusters.values()
+                for id in clusters.index[clusters["parent"].isin(frontier)]
+                if id not in found
+            }
+            found |= frontier
+        return found
+
+    def is_cluster(self, id: str) -> bool:
+        return any(id in clusters.index for clusters in self._clusters.values())
+
+    def precompute(self) -> None:
+        for groupings in combinations() + self._cuts():
+            if all(level in self._clusters for level in groupings.values()):
+                self.view(groupings)
+
+    def views(self) -> list:
+        return list(self._views.values())
@@ -1,6 +1,9 @@
 from app import app
 
+import callbacks.expand_nodes
 import callbacks.highlight_nodes
+import callbacks.page_tables
+import callbacks.reload_data
 import callbacks.update_nodes
 
 if __name__ == "__main__":
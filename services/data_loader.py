@@ -1,187 +1,260 @@
+import gc
+import logging
+import resource
+import time
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from components.cytoscape import Edge, Elements, Node
 from components.graph import Graph
-from components.nodes_model import Dataset, Measure, Nodes, Page, Report, Table, Visual, Workspace
+from services.model_cache import ANCESTORS, ModelTables, model_cache, source_key
+
+logger = logging.getLogger(__name__)
+
+# rows read from the CSV exports at a time, each chunk is parsed into
+# columns before the next one is read
+CHUNK_SIZE = 100_000
+
+NODE_DTYPES = {
+    'id': str,
+    'label': str,
+    'node_type': 'category',
+    'source': str,
+    'source_label': str,
+    'location': 'category',
+    'location_label': 'category',
+    'workspace': 'category',
+    'workspace_label': 'category',
+}
+
+EDGE_DTYPES = {
+    'source': str,
+    'target': str,
+}
+
+
+# node type of the rows placed in each branch of the hierarchy, the level
+# of their source and the level of its location
+PLACEMENTS = [('measure', 'table', 'dataset'), ('visual', 'page', 'report')]
+
+
+def _values(column: pd.Series) -> np.ndarray:
+    # categorical and string columns as object arrays, missing values as None
+    values = column.astype(object).to_numpy()
+    return np.where(pd.isna(values), None, values)
 
 
-def build_node_structure(df):
-    # Dictionaries to hold unique instances
-    workspaces = {}
-    datasets = {}
-    reports = {}
-    tables = {}
-    pages = {}
+def tables_from_rows(rows: pd.DataFrame) -> tuple:
+    """
+    Node and cluster tables of the node rows of an export, as ModelTables
+    takes them. Clusters are in depth-first order of the workspace ->
+    dataset/report -> table/page hierarchy, nodes follow the order of their
+    table or page and hold the ids of the clusters they are in.
 
-    # Group the data by workspace
-    grouped = df.groupby(['workspace', 'workspace_label'])
+    The first row of a location or source decides where it is attached,
+    the last row of a node in a source its label. Workspaces are ordered by
+    id, everything else by its first row.
+    """
+    rows = rows.reset_index(drop=True)
+    workspaces = rows.drop_duplicates(subset=['workspace'])
+    workspaces = workspaces.iloc[np.argsort(_values(workspaces['workspace']).astype(str), kind='stable')]
+    workspace_rank = pd.Series(np.arange(len(workspaces)), index=_values(workspaces['workspace']))
 
-    for (workspace_id, workspace_label), group in grouped:
-        if workspace_id not in workspaces:
-            workspaces[workspace_id] = {
-                'id': workspace_id,
-                'label': workspace_label,
+    # clusters and nodes are sorted by the rank of their workspace, branch,
+    # location, source and node, -1 for the levels below a cluster
+    clusters = [
+        pd.DataFrame(
+            {
+                'id': _values(workspaces['workspace']),
+                'label': _values(workspaces['workspace_label']),
                 'type': 'workspace',
-                'children_datasets': {},
-                'children_reports': {}
+                'parent': None,
             }
-        
-        for _, row in group.iterrows():
-            node_type = row['node_type']
-            location_id = row['location']
-            location_label = row['location_label']
-            source_id = row['source']
-            source_label = row['source_label']
-            
-            if node_type == 'measure':
-                # Measures belong to Tables, which belong to Datasets
-                if location_id not in datasets:
-                    datasets[location_id] = {
-                        'id': location_id,
-                        'label': location_label,
-                        'type': 'dataset',
-                        'parent': workspace_id,
-                        'children_tables': {}
-                    }
-                    workspaces[workspace_id]['children_datasets'][location_id] = datasets[location_id]
-                
-                if source_id not in tables:
-                    tables[source_id] = {
-                        'id': source_id,
-                        'label': source_label,
-                        'type': 'table',
-                        'parent': location_id,
-                        'children_measures': {}
-                    }
-                    datasets[location_id]['children_tables'][source_id] = tables[source_id]
-                
-                # Add Measure
-                measure_id = row['id']
-                tables[source_id]['children_measures'][measure_id] = {
-                    'id': measure_id,
-                    'label': row['label'],
-                    'type': 'measure',
-                    'parent': source_id
+        )
+    ]
+    none = np.full(len(workspaces), -1)
+    cluster_keys = [np.column_stack([workspace_rank.to_numpy(), none, none, none])]
+    nodes, node_keys = [], []
+
+    for branch, (node_type, source_level, location_level) in enumerate(PLACEMENTS):
+        placed = rows[rows['node_type'] == node_type]
+        locations = placed.drop_duplicates(subset=['location'])
+        sources = placed.drop_duplicates(subset=['source'])
+        children = placed.drop_duplicates(subset=['source', 'id'])
+
+        location_workspaces = _values(locations['workspace'])
+        location_keys = np.column_stack(
+            [
+                workspace_rank.reindex(location_workspaces).to_numpy(),
+                np.full(len(locations), branch),
+                np.arange(len(locations)),
+                np.full(len(locations), -1),
+            ]
+        )
+        source_locations = pd.Index(_values(locations['location'])).get_indexer(_values(sources['location']))
+        source_keys = location_keys[source_locations].copy()
+        source_keys[:, 3] = np.arange(len(sources))
+
+        clusters.append(
+            pd.DataFrame(
+                {
+                    'id': _values(locations['location']),
+                    'label': _values(locations['location_label']),
+                    'type': location_level,
+                    'parent': location_workspaces,
                 }
-            
-            elif node_type == 'visual':
-                # Visuals belong to Pages, which belong to Reports
-                if location_id not in reports:
-                    reports[location_id] = {
-                        'id': location_id,
-                        'label': location_label,
-                        'type': 'report',
-                        'parent': workspace_id,
-                        'children_pages': {}
-                    }
-                    workspaces[workspace_id]['children_reports'][location_id] = reports[location_id]
-                
-                if source_id not in pages:
-                    pages[source_id] = {
-                        'id': source_id,
-                        'label': source_label,
-                        'type': 'page',
-                        'parent': location_id,
-                        'children_visuals': {}
-                    }
-                    reports[location_id]['children_pages'][source_id] = pages[source_id]
-                
-                # Add Visual
-                visual_id = row['id']
-                pages[source_id]['children_visuals'][visual_id] = {
-                    'id': visual_id,
-                    'label': row['label'],
-                    'type': 'visual',
-                    'parent': source_id
+            )
+        )
+        clusters.append(
+            pd.DataFrame(
+                {
+                    'id': _values(sources['source']),
+                    'label': _values(sources['source_label']),
+                    'type': source_level,
+                    'parent': _values(sources['location']),
                 }
-
-    return workspaces
-
-
-def initialize_nodes(workspaces):
-    nodes = []
-    for workspace in workspaces.values():
-        workspace_children = []
-        
-        # Add Datasets
-        for dataset in workspace['children_datasets'].values():
-            tables_list = []
-            for table in dataset['children_tables'].values():
-                measures_list = [Measure(**measure) for measure in table['children_measures'].values()]
-                tables_list.append(Table(
-                    id=table['id'],
-                    label=table['label'],
-                    type=table['type'],
-                    parent=table['parent'],
-                    children=measures_list
-                ))
-            
-            dataset_model = Dataset(
-                id=dataset['id'],
-                label=dataset['label'],
-                type=dataset['type'],
-                parent=dataset['parent'],
-                children=tables_list
             )
-            workspace_children.append(dataset_model)
-        
-        # Add Reports
-        for report in workspace['children_reports'].values():
-            pages_list = []
-            for page in report['children_pages'].values():
-                visuals_list = [Visual(**visual) for visual in page['children_visuals'].values()]
-                pages_list.append(Page(
-                    id=page['id'],
-                    label=page['label'],
-                    type=page['type'],
-                    parent=page['parent'],
-                    children=visuals_list
-                ))
-            
-            report_model = Report(
-                id=report['id'],
-                label=report['label'],
-                type=report['type'],
-                parent=report['parent'],
-                children=pages_list
+        )
+        cluster_keys += [location_keys, source_keys]
+
+        child_sources = pd.Index(_values(sources['source'])).get_indexer(_values(children['source']))
+        last = placed.drop_duplicates(subset=['source', 'id'], keep='last').set_index(['source', 'id'])['label']
+        labels = last.reindex(pd.MultiIndex.from_frame(children[['source', 'id']]))
+        ancestors = {level: None for level in ANCESTORS}
+        ancestors.update(
+            {
+                source_level: _values(children['source']),
+                location_level: _values(sources['location'])[child_sources],
+                'workspace': location_workspaces[source_locations][child_sources],
+            }
+        )
+        nodes.append(
+            pd.DataFrame(
+                {
+                    'id': _values(children['id']),
+                    'label': _values(labels),
+                    'type': node_type,
+                    'parent': _values(children['source']),
+                    **ancestors,
+                }
             )
-            workspace_children.append(report_model)
-        
-        workspace_model = Workspace(
-            id=workspace['id'],
-            label=workspace['label'],
-            type=workspace['type'],
-            children=workspace_children
         )
-        nodes.append(workspace_model)
+        node_keys.append(np.column_stack([source_keys[child_sources], np.arange(len(children))]))
 
-    # Create the final Elements instance
-    return nodes
+    clusters = pd.concat(clusters, ignore_index=True)
+    nodes = pd.concat(nodes, ignore_index=True)
+    cluster_keys, node_keys = np.concatenate(cluster_keys), np.concatenate(node_keys)
+    # lexsort takes the most significant key last
+    clusters = clusters.iloc[np.lexsort(cluster_keys.T[::-1])]
+    nodes = nodes.iloc[np.lexsort(node_keys.T[::-1])]
+    # columns typed as when built from lists, concat leaves the ones with
+    # missing values in some parts as objects
+    return tuple(
+        pd.DataFrame({column: frame[column].to_numpy() for column in frame.columns})
+        for frame in [nodes, clusters]
+    )
 
 
-def load_data():
-    nodes_df = pd.read_csv("data/nodes.csv")
-    edges_df = pd.read_csv("data/edges.csv")
+def _concat(chunks: list) -> pd.DataFrame:
+    # categories differ between chunks, they are unioned rather than
+    # turned into object columns by concat
+    columns = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals(parts, ignore_order=True)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
 
 
-    workspaces = build_node_structure(nodes_df)
-    nodes = initialize_nodes(workspaces)
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
-    edges = [
-        {
-            "id": edge["source"] + "->" + edge["target"],
-            "source": edge["source"],
-            "target": edge["target"],
-        }
-        for _, edge in edges_df.iterrows()
-    ]
 
-    model = Nodes(workspaces=nodes, edges=edges)
+def _read_csv(path, dtypes, chunksize) -> pd.DataFrame:
+    # chunks stay in columnar form, no Python object is made per row
+    chunks = list(pd.read_csv(path, dtype=dtypes, usecols=list(dtypes), chunksize=chunksize))
+    if not chunks:
+        return pd.read_csv(path, dtype=dtypes, usecols=list(dtypes), nrows=0)
+    return _concat(chunks)
+
+
+def _parse_csv(nodes_path, edges_path, chunksize):
+    rows = _read_csv(nodes_path, NODE_DTYPES, chunksize)
+    edges = _read_csv(edges_path, EDGE_DTYPES, chunksize)
+    edges.insert(0, 'id', edges['source'] + '->' + edges['target'])
+    return rows, edges
+
+
+@contextmanager
+def _gc_paused():
+    # building the model allocates hundreds of thousands of objects that all
+    # stay alive, collecting in between only rescans them
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_data(nodes_path='data/nodes.csv', edges_path='data/edges.csv', chunksize=CHUNK_SIZE, use_cache=True):
+    start = time.perf_counter()
+    sources = [nodes_path, edges_path]
+
+    # warm start from the columnar cache of a previous parse
+    with _gc_paused():
+        model, metadata = model_cache.load(sources) if use_cache else (None, None)
+    cached = model is not None
+
+    if cached:
+        num_node_rows = metadata['node_rows']
+        num_edge_rows = metadata['edge_rows']
+        types = metadata['types']
+    else:
+        # described before parsing, so later changes are never recorded as
+        # cached, the file hashes also key the model
+        described = model_cache.describe(sources)
+        key = source_key(described, sources)
+        rows, edges = _parse_csv(nodes_path, edges_path, chunksize)
+        num_node_rows, num_edge_rows = len(rows), len(edges)
+        types = rows['node_type'].drop_duplicates().tolist()
+
+        # graphs are built from the tables, the Nodes model is only built
+        # from them, without validation, for the callers asking for it
+        node_table, cluster_table = tables_from_rows(rows)
+        del rows
+        model = ModelTables(node_table, cluster_table, edges, key=key)
+
+        if use_cache and model_cache.enabled:
+            metadata = {'node_rows': num_node_rows, 'edge_rows': num_edge_rows, 'types': types, 'key': key}
+            model_cache.save(described, model.nodes, model.clusters, model.edges, metadata)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'cached': cached,
+        'node_rows': num_node_rows,
+        'edge_rows': num_edge_rows,
+        'seconds': elapsed,
+        'rows_per_second': (num_node_rows + num_edge_rows) / elapsed if elapsed else float('inf'),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+    logger.info(
+        'loaded %d node rows and %d edge rows in %.2fs (%.0f rows/s, peak RSS %.0f MB)',
+        stats['node_rows'], stats['edge_rows'], stats['seconds'], stats['rows_per_second'], stats['peak_rss_mb'],
+    )
 
     return {
         "model": model,
-        "types": nodes_df["node_type"].unique(),
-        "datasets": [dataset.model_dump(exclude_none=True)["label"]for dataset in model.get_datasets()],
-        "reports": [report.model_dump(exclude_none=True)["label"] for report in model.get_reports()],
-        "tables": [table.model_dump(exclude_none=True)["label"] for table in model.get_tables()],
-        "pages": [page.model_dump(exclude_none=True)["label"] for page in model.get_pages()],
-    }
\ No newline at end of file
+        "types": types,
+        "datasets": model.labels("dataset"),
+        "reports": model.labels("report"),
+        "tables": model.labels("table"),
+        "pages": model.labels("page"),
+        "stats": stats,
+    }
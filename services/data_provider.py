@@ -0,0 +1,122 @@
+import logging
+import os
+import threading
+
+from services.data_loader import load_data
+from services.graph_cache import update_graph
+from services.session_store import put_model
+
+logger = logging.getLogger(__name__)
+
+# seconds between checks of the source files, 0 disables background reloads
+DATA_RELOAD_INTERVAL = float(os.environ.get("DATA_RELOAD_INTERVAL", 30))
+
+
+class DataProvider:
+    """
+    Owns the loaded model and its filter options for the whole process.
+
+    The data is loaded on first use and shared by the layout and every
+    callback. A background thread reloads it when the source files change
+    and swaps the new data in atomically, so readers never see a partial
+    load.
+    """
+
+    def __init__(self, nodes_path="data/nodes.csv", edges_path="data/edges.csv"):
+        self.sources = [nodes_path, edges_path]
+        self.version = 0
+        self._data = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def _source_stamp(self):
+        stamp = []
+        for path in self.sources:
+            stat = os.stat(path)
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamp)
+
+    def _load(self) -> tuple:
+        stamp = self._source_stamp()
+        data = load_data(*self.sources)
+        data["key"] = put_model(data["model"])
+        # the modification time of the newest source file orders the data
+        # loaded by every worker reading the same files, in milliseconds to
+        # stay exact as a JavaScript number
+        data["version"] = max(mtime_ns for mtime_ns, _ in stamp) // 10**6
+        return stamp, data
+
+    def get(self) -> dict:
+        """
+        The current data: model, its session key and version, types,
+        datasets, reports, tables and pages.
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._stamp, self._data = self._load()
+                    self.version += 1
+                data = self._data
+        return data
+
+    def version_of(self, key: str) -> int:
+        """
+        Version of the data of `key` if it is the current data, 0 otherwise,
+        any data pushed to the page later is then newer.
+        """
+        data = self.get()
+        return data["version"] if data["key"] == key else 0
+
+    def reload(self, force=False) -> bool:
+        """
+        Reload if the source files changed since the last load. Returns
+        whether new data was swapped in.
+        """
+        with self._lock:
+            if not force and self._data is not None and self._source_stamp() == self._stamp:
+                return False
+            previous = self._data
+            stamp, data = self._load()
+            # bring the cached graph up to date before readers see the new key
+            if previous is not None and previous["key"] != data["key"]:
+                diff = update_graph(previous["key"], data["key"], data["model"])
+                if diff is not None:
+                    logger.info(
+                        "applied %d added, %d removed and %d updated node rows, %d added and %d removed edges",
+                        len(diff.added_nodes),
+                        len(diff.removed_nodes) + len(diff.removed_placements),
+                        len(diff.updated_nodes),
+                        len(diff.added_edges),
+                        len(diff.removed_edges),
+                    )
+            self._stamp, self._data = stamp, data
+            self.version += 1
+        logger.info("reloaded data, version %d", self.version)
+        return True
+
+    def start_watching(self, interval: float = DATA_RELOAD_INTERVAL):
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("failed to reload data")
+
+        self._watcher = threading.Thread(target=watch, name="data-provider", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._watcher = None
+        self._stop = threading.Event()
+
+
+data_provider = DataProvider()
@@ -0,0 +1,320 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from components.cytoscape import Elements
+from components.graph import Graph
+from components.graph_diff import GraphDiff
+from components.nodes_model import Nodes
+from services.model_cache import ModelTables
+
+# memory budget shared by every cached graph and derived view
+GRAPH_CACHE_MAX_BYTES = int(os.environ.get("GRAPH_CACHE_MAX_BYTES", 512 * 2**20))
+
+# "networkx" or "csr", the latter keeps adjacency in NumPy arrays and suits
+# graphs too large for networkx's per-node dicts
+GRAPH_BACKEND = os.environ.get("GRAPH_BACKEND", "networkx")
+
+# "incremental" sends every node with its position in a layered layout of
+# the whole graph, so that nodes stay in place across views and reloads,
+# "server" lays out every view on its own, both for Cytoscape's preset
+# layout, "client" leaves the layout to klay
+LAYOUT_MODE = os.environ.get("LAYOUT_MODE", "incremental")
+
+# most elements sent to the browser, views over it are grouped into their
+# clusters and clusters are expanded on tap, 0 sends every element
+ELEMENT_BUDGET = int(os.environ.get("ELEMENT_BUDGET", 3000))
+
+
+def fingerprint(data) -> str:
+    """
+    Content hash of a JSON-serializable model or element list.
+    """
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def estimate_size(value) -> int:
+    if isinstance(value, Graph):
+        size = value.nodes.memory_usage(deep=True).sum()
+        size += value.edges.memory_usage(deep=True).sum()
+        if value.backend == "csr":
+            size += value.csr.nbytes
+        else:
+            # networkx keeps a few dicts per node and per edge
+            size += 500 * value.g.number_of_nodes() + 200 * value.g.number_of_edges()
+        if value.is_computed("lineage_index") and value.lineage_index is not None:
+            size += value.lineage_index.nbytes
+        if value.is_computed("node_table"):
+            size += value.node_table.nbytes
+        if value.is_computed("rollup"):
+            size += sum(estimate_size(view) for view in value.rollup.views())
+        return int(size)
+    if isinstance(value, ModelTables):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return 300 * len(value)
+    if isinstance(value, dict):
+        return sum(
+            estimate_size(v) if isinstance(v, dict) else 100 * len(v) if isinstance(v, list) else 100
+            for v in value.values()
+        )
+    return 1000
+
+
+class GraphCache:
+    """
+    Thread-safe LRU cache of built graphs and derived views, bounded by an
+    estimate of their memory use.
+    """
+
+    def __init__(self, max_bytes: int = GRAPH_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_build(self, key: Hashable, build: Callable):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        value = build()
+
+        with self._lock:
+            if key not in self._entries:
+                self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self.pop(key)
+            size = estimate_size(value)
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, size = self._entries.pop(key)
+            self.nbytes -= size
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _evict(self):
+        # always keep the most recent entry, even if it is over budget
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+
+
+graph_cache = GraphCache()
+
+
+def model_key(model) -> str:
+    if isinstance(model, ModelTables):
+        return model.key
+    if isinstance(model, Nodes):
+        model = model.model_dump(exclude_none=True)
+    return fingerprint(model)
+
+
+def graph_tables(model) -> tuple:
+    """
+    Node and edge frames and the clusters of `model`, built from the tables
+    of ModelTables directly.
+    """
+    if isinstance(model, ModelTables):
+        return model.graph_tables()
+    return Graph.tables_from_model(model if isinstance(model, Nodes) else Nodes(**model))
+
+
+def graph_from_model(model, key: str = None) -> Graph:
+    """
+    Graph of `model`, given as ModelTables, `Nodes`, its dumped dict or, with
+    its `key`, as a function loading it. The function is only called when
+    the graph is not cached, as are the ones passed to the views below.
+    """
+    key = key or model_key(model)
+
+    def build():
+        loaded = model() if callable(model) else model
+        graph = Graph(*graph_tables(loaded), lineage_index=True, backend=GRAPH_BACKEND)
+        return _prepare(graph)
+
+    return graph_cache.get_or_build(("model", key), build)
+
+
+def _prepare(graph: Graph) -> Graph:
+    # lineage queries and cluster filters of every view start from the base
+    # graph, and its groupings are switched between, build them all upfront
+    # so they are counted in the cached size
+    graph.lineage_index
+    graph.cluster_index
+    graph.rollup.precompute()
+    if LAYOUT_MODE == "incremental":
+        # every view is placed from the layout of the whole graph
+        graph.cluster_positions
+    return graph
+
+
+def update_graph(old_key: str, key: str, model: ModelTables) -> GraphDiff:
+    """
+    Move the cached graph of `old_key` to `key`, the key of `model`, applying
+    only what changed between the two models instead of building it again.
+    Returns the applied diff, or None if there was no cached graph to update.
+    Views of the old model stay cached under `old_key`.
+
+    The diff is applied to a copy that is swapped in once updated, requests
+    still holding the old graph keep reading it unchanged. Only the graph,
+    its lineage index and layout are patched, its grouped views, cluster
+    index and cluster positions are built again on first use rather than
+    all upfront as for a new graph, and are not counted in its cached size.
+    """
+    if ("model", key) in graph_cache:
+        return None
+    graph = graph_cache.pop(("model", old_key))
+    if graph is None:
+        return None
+    diff = graph.diff(*graph_tables(model))
+    updated = graph.copy()
+    updated.apply_diff(diff)
+    graph_cache.put(("model", key), updated)
+    return diff
+
+
+def _view_params(selected_table=None, groupings: dict = None, expanded=None) -> tuple:
+    return (
+        tuple(sorted(selected_table or [])),
+        tuple(sorted((groupings or {}).items())),
+        tuple(sorted(expanded or [])),
+    )
+
+
+def _related_graph(model, selected_table: tuple, key: str) -> Graph:
+    # graph the views of a table filter are grouped from
+    g = graph_from_model(model, key)
+    if not selected_table:
+        return g
+
+    def build():
+        related = g.select_related_elements(
+            selected_cluster="table", selected_values=list(selected_table), copy=True
+        )
+        related.rollup.precompute()
+        return related
+
+    return graph_cache.get_or_build(("view", key, selected_table), build)
+
+
+def graph_view(model, selected_table=None, groupings: dict = None, key: str = None, expanded=None) -> Graph:
+    """
+    Graph filtered to the lineage of `selected_table`, grouped by `groupings`
+    and with the clusters in `expanded` opened. Views still over
+    ELEMENT_BUDGET, when even the coarsest grouping does not fit, are cut
+    down to it.
+    """
+    key = key or model_key(model)
+    selected_table, groupings, expanded = _view_params(selected_table, groupings, expanded)
+    g = _related_graph(model, selected_table, key)
+
+    if expanded:
+        return graph_cache.get_or_build(
+            ("detail", key, selected_table, groupings, expanded),
+            lambda: g.rollup.detail(dict(groupings), expanded),
+        )
+    # every grouping is kept by the rollup of the graph it groups
+    view = g.rollup.view(dict(groupings))
+    if 0 < ELEMENT_BUDGET < view.num_elements:
+        return graph_cache.get_or_build(
+            ("capped", key, selected_table, groupings, ELEMENT_BUDGET),
+            lambda: g.rollup.capped(view, ELEMENT_BUDGET),
+        )
+    return view
+
+
+def fit_groupings(model, selected_table=None, groupings: dict = None, budget: int = 0, key: str = None) -> dict:
+    """
+    Finest grouping, no finer than `groupings`, that shows the view of
+    `selected_table` in at most `budget` elements. `groupings` as given when
+    there is no budget.
+    """
+    if budget <= 0:
+        return dict(groupings or {})
+    key = key or model_key(model)
+    g = _related_graph(model, _view_params(selected_table)[0], key)
+    return g.rollup.fit(budget, groupings)
+
+
+def view_elements(model, selected_table=None, groupings: dict = None, key: str = None, expanded=None) -> list:
+    key = key or model_key(model)
+
+    def build():
+        g = graph_view(model, selected_table, groupings, key, expanded)
+        positions = None
+        if LAYOUT_MODE == "incremental":
+            positions = graph_from_model(model, key).place(g)
+        elif LAYOUT_MODE == "server":
+            positions = g.positions
+        return g.export_records(validate_sample=True, positions=positions)
+
+    return graph_cache.get_or_build(
+        ("elements", key, *_view_params(selected_table, groupings, expanded)), build
+    )
+
+
+def view_adjacency(model, selected_table=None, groupings: dict = None, key: str = None, expanded=None) -> dict:
+    """
+    CSR adjacency of a view, sent to the browser for clientside highlighting.
+    """
+    key = key or model_key(model)
+    return graph_cache.get_or_build(
+        ("adjacency", key, *_view_params(selected_table, groupings, expanded)),
+        lambda: graph_view(model, selected_table, groupings, key, expanded).adjacency(),
+    )
+
+
+def _view_key(view: dict) -> tuple:
+    return (view["dataset"], *_view_params(view["table"], view["groupings"], view.get("expanded")))
+
+
+def view_patch(old_model, old_view: dict, model, view: dict) -> dict:
+    """
+    Patch turning the elements of `old_view` into those of `view`, views as
+    kept in the "elements" store, for `elements.applyPatch` in the browser.
+    Without `old_model` the patch replaces every element. Element lists are
+    sent in the columnar form of `Elements.encode`.
+    """
+
+    def elements(model, view):
+        return view_elements(
+            model, view["table"], view["groupings"], key=view["dataset"], expanded=view.get("expanded")
+        )
+
+    if old_model is None:
+        return graph_cache.get_or_build(
+            ("patch", None, _view_key(view)),
+            lambda: {"elements": Elements.encode(elements(model, view))},
+        )
+
+    def build():
+        patch = Elements.diff(elements(old_model, old_view), elements(model, view))
+        return {**patch, "add": Elements.encode(patch["add"]), "update": Elements.encode(patch["update"])}
+
+    return graph_cache.get_or_build(("patch", _view_key(old_view), _view_key(view)), build)
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import defaultdict
+
+import pandas as pd
+
+from components.nodes_model import Dataset, Edge, Measure, Nodes, Page, Report, Table, Visual, Workspace
+
+try:
+    import pyarrow as pa
+except ImportError:  # the cache is skipped without pyarrow
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', '.cache/model')
+
+# bumped when the tables change, older caches are then parsed again
+FORMAT = 2
+
+TABLES = ['nodes', 'clusters', 'edges']
+# clusters each node is in, as the columns of `Graph.tables_from_model`
+ANCESTORS = ['page', 'table', 'report', 'dataset', 'workspace']
+COLUMNS = {
+    'nodes': ['id', 'label', 'type', 'parent', *ANCESTORS],
+    'clusters': ['id', 'label', 'type', 'parent'],
+    'edges': ['id', 'source', 'target'],
+}
+# levels of the clusters dict of a graph, in the order Graph builds it
+CLUSTER_LEVELS = ['workspace', 'dataset', 'report', 'table', 'page']
+
+# child model and the type of its parent, for each level of the hierarchy
+LEVELS = {
+    'dataset': (Dataset, 'workspace'),
+    'report': (Report, 'workspace'),
+    'table': (Table, 'dataset'),
+    'page': (Page, 'report'),
+    'measure': (Measure, 'table'),
+    'visual': (Visual, 'page'),
+}
+
+
+def file_hash(path, block_size=2**20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_key(described, sources) -> str:
+    """
+    Key of the model parsed from `sources`, described by `ModelCache.describe`:
+    a hash of their content hashes and of the table FORMAT, so that it
+    changes with either.
+    """
+    digest = hashlib.sha1(f'format {FORMAT}'.encode())
+    for path in sources:
+        digest.update(described[path]['sha1'].encode())
+    return digest.hexdigest()
+
+
+def model_from_tables(nodes, clusters, edges) -> Nodes:
+    """
+    Rebuild the model from its tables. The tables were written from a
+    validated model, so the pydantic objects are constructed without
+    validating them again.
+    """
+    # children are collected in reverse and flipped when attached to their parent
+    children = defaultdict(list)
+
+    for id, label, type, parent in reversed(list(zip(*(nodes[column] for column in COLUMNS['clusters'])))):
+        model, parent_type = LEVELS[type]
+        children[(parent_type, parent)].append(
+            model.model_construct(id=id, label=label, type=type, parent=parent)
+        )
+
+    # walking the depth-first rows backwards completes every level before its parent
+    workspaces = []
+    rows = list(zip(*(clusters[column] for column in COLUMNS['clusters'])))
+    for id, label, type, parent in reversed(rows):
+        if type == 'workspace':
+            workspaces.append(
+                Workspace.model_construct(id=id, label=label, type=type, children=children.pop((type, id), [])[::-1])
+            )
+            continue
+        model, parent_type = LEVELS[type]
+        children[(parent_type, parent)].append(
+            model.model_construct(
+                id=id, label=label, type=type, parent=parent, children=children.pop((type, id), [])[::-1]
+            )
+        )
+
+    edges = [
+        Edge.model_construct(id=id, source=source, target=target)
+        for id, source, target in zip(*(edges[column] for column in COLUMNS['edges']))
+    ]
+    return Nodes.model_construct(workspaces=workspaces[::-1], edges=edges)
+
+
+class ModelTables:
+    """
+    Node, cluster and edge tables of a model, as
+    `data_loader.tables_from_rows` builds them and the cache stores them. Graphs are built from the tables
+    directly, the `Nodes` model is only rebuilt when `model` is asked for.
+    `key` identifies the content of the source files they were parsed from.
+    """
+
+    def __init__(self, nodes, clusters, edges, key: str, model: Nodes = None):
+        self.nodes = pd.DataFrame(nodes, columns=COLUMNS['nodes'])
+        self.clusters = pd.DataFrame(clusters, columns=COLUMNS['clusters'])
+        self.edges = pd.DataFrame(edges, columns=COLUMNS['edges'])
+        self.key = key
+        self._model = model
+
+    @property
+    def model(self) -> Nodes:
+        if self._model is None:
+            self._model = model_from_tables(
+                *(table.to_dict('list') for table in [self.nodes, self.clusters, self.edges])
+            )
+        return self._model
+
+    @property
+    def nbytes(self) -> int:
+        # the tables only, a model rebuilt from them comes on top
+        return int(sum(table.memory_usage(deep=True).sum() for table in [self.nodes, self.clusters, self.edges]))
+
+    def __getstate__(self):
+        # stored without the model, it is rebuilt where it is needed
+        return {**self.__dict__, '_model': None}
+
+    def graph_tables(self) -> tuple:
+        """
+        Node and edge frames and clusters dict of `Graph.tables_from_model`.
+        """
+        clusters = {level: [] for level in CLUSTER_LEVELS}
+        for item in self.clusters.to_dict('records'):
+            # workspaces have no parent
+            clusters[item['type']].append({k: v for k, v in item.items() if v is not None and v == v})
+        return self.nodes.copy(), self.edges.copy(), clusters
+
+    def labels(self, type: str) -> list:
+        """
+        Labels of the clusters of `type`, e.g. "table", in model order.
+        """
+        return self.clusters.loc[self.clusters['type'] == type, 'label'].tolist()
+
+
+class ModelCache:
+    """
+    Normalized node, cluster and edge tables of the parsed CSV exports,
+    stored as Arrow IPC files next to a manifest of the source files.
+    """
+
+    def __init__(self, cache_dir=MODEL_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    @property
+    def enabled(self):
+        return pa is not None
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path('manifest.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def describe(sources):
+        """
+        Modification time, size and hash of the source files, taken before
+        they are parsed so later changes are never recorded as cached.
+        """
+        described = {}
+        for path in sources:
+            stat = os.stat(path)
+            described[path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': file_hash(path)}
+        return described
+
+    def is_fresh(self, sources):
+        return self._fresh_manifest(sources) is not None
+
+    def _fresh_manifest(self, sources):
+        # the manifest, if it describes `sources` as they are now
+        manifest = self._read_manifest()
+        if not manifest or manifest.get('format') != FORMAT or set(manifest['sources']) != set(sources):
+            return None
+
+        touched = False
+        for path in sources:
+            cached = manifest['sources'][path]
+            stat = os.stat(path)
+            if stat.st_mtime_ns == cached['mtime_ns'] and stat.st_size == cached['size']:
+                continue
+            # the file was touched, it is only stale if its content changed
+            if stat.st_size != cached['size'] or file_hash(path) != cached['sha1']:
+                return None
+            cached['mtime_ns'] = stat.st_mtime_ns
+            touched = True
+
+        if touched:
+            self._write_manifest(manifest)
+        return manifest
+
+    def _replace(self, name, write):
+        # written to a temporary file next to `name` and moved over it, so
+        # readers see either the old file or the new one, never a partial one
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=f'{name}.', suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, self._path(name))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _write_manifest(self, manifest):
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump(manifest, f)
+
+        self._replace('manifest.json', write)
+
+    def load(self, sources):
+        """
+        ModelTables of the cached tables and the metadata saved with them,
+        or (None, None) if the cache is missing or stale.
+        """
+        if not self.enabled:
+            return None, None
+        manifest = self._fresh_manifest(sources)
+        if manifest is None:
+            return None, None
+
+        tables = {}
+        for name in TABLES:
+            with pa.memory_map(self._path(f'{name}.arrow')) as source:
+                tables[name] = pa.ipc.open_file(source).read_all().to_pandas()
+
+        # another process saved other tables while these were read, the
+        # manifest was taken down before and names the new ones after
+        metadata = manifest.get('metadata', {})
+        current = self._read_manifest()
+        if current is None or current.get('metadata', {}).get('key') != metadata.get('key'):
+            return None, None
+        return ModelTables(tables['nodes'], tables['clusters'], tables['edges'], key=metadata['key']), metadata
+
+    def save(self, described, nodes, clusters, edges, metadata=None):
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # invalidate first, so a crash mid-write never leaves a fresh manifest
+        # over other tables
+        try:
+            os.remove(self._path('manifest.json'))
+        except FileNotFoundError:
+            pass
+
+        for name, data in zip(TABLES, [nodes, clusters, edges]):
+            table = pa.table({column: pa.array(data[column], type=pa.string()) for column in COLUMNS[name]})
+
+            def write(path, table=table):
+                with pa.OSFile(path, 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+
+            self._replace(f'{name}.arrow', write)
+
+        # written last, once every table is in place
+        self._write_manifest({'format': FORMAT, 'sources': described, 'metadata': metadata or {}})
+        logger.info('cached parsed model in %s', self.cache_dir)
+
+
+model_cache = ModelCache()
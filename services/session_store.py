@@ -0,0 +1,172 @@
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from services.graph_cache import estimate_size, graph_cache, model_key
+from services.model_cache import ModelTables
+
+# "memory" keeps values in this process, "sqlite" shares them between the
+# workers of one host through SESSION_STORE_PATH
+SESSION_STORE_BACKEND = os.environ.get("SESSION_STORE_BACKEND", "memory")
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH", "session_store.sqlite")
+SESSION_STORE_MAX_ITEMS = int(os.environ.get("SESSION_STORE_MAX_ITEMS", 64))
+# every reload stores a new model, the least recently used ones are evicted
+# past this size, the most recent one is always kept
+SESSION_STORE_MAX_BYTES = int(os.environ.get("SESSION_STORE_MAX_BYTES", 512 * 2**20))
+
+
+class MemoryStore:
+    """
+    LRU store of this process, bounded by item count and an estimate of
+    the memory of its values.
+    """
+
+    def __init__(self, max_items: int = SESSION_STORE_MAX_ITEMS, max_bytes: int = SESSION_STORE_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key][0]
+
+    def set(self, key: str, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while len(self._items) > 1 and (len(self._items) > self.max_items or self.nbytes > self.max_bytes):
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+
+class SqliteStore:
+    """
+    File-backed store, safe to share between processes on one host, bounded
+    by item count and the size of the pickled values.
+    """
+
+    # access counter used for LRU eviction, timestamps can tie
+    _NEXT_ACCESS = "(SELECT COALESCE(MAX(accessed), 0) + 1 FROM store)"
+
+    def __init__(
+        self,
+        path: str = SESSION_STORE_PATH,
+        max_items: int = SESSION_STORE_MAX_ITEMS,
+        max_bytes: int = SESSION_STORE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS store ("
+                "key TEXT PRIMARY KEY, value BLOB, accessed INTEGER, size INTEGER NOT NULL DEFAULT 0)"
+            )
+            # stores created before values were sized
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(store)")]
+            if "size" not in columns:
+                conn.execute("ALTER TABLE store ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self) -> sqlite3.Connection:
+        if not hasattr(self._local, "conn"):
+            self._local.conn = sqlite3.connect(self.path, timeout=30)
+        return self._local.conn
+
+    def get(self, key: str):
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM store WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(f"UPDATE store SET accessed = {self._NEXT_ACCESS} WHERE key = ?", (key,))
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO store (key, value, accessed, size) VALUES (?, ?, {self._NEXT_ACCESS}, ?)",
+                (key, blob, len(blob)),
+            )
+            # the most recently used values that fit, and at least the last one
+            conn.execute(
+                "DELETE FROM store WHERE key IN ("
+                "SELECT key FROM ("
+                "SELECT key, ROW_NUMBER() OVER recent AS rank, SUM(size) OVER recent AS total FROM store "
+                "WINDOW recent AS (ORDER BY accessed DESC)"
+                ") WHERE rank > 1 AND (rank > ? OR total > ?))",
+                (self.max_items, self.max_bytes),
+            )
+
+    def __contains__(self, key: str) -> bool:
+        with self._connection() as conn:
+            return conn.execute("SELECT 1 FROM store WHERE key = ?", (key,)).fetchone() is not None
+
+
+def create_store(backend: str = SESSION_STORE_BACKEND):
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "sqlite":
+        return SqliteStore()
+    raise ValueError(f"unknown session store backend: {backend}")
+
+
+session_store = create_store()
+
+
+def put_model(model: ModelTables) -> str:
+    """
+    Store `model` server-side and return the key the browser keeps instead.
+    """
+    key = model_key(model)
+    if key not in session_store:
+        session_store.set(key, model)
+    return key
+
+
+def get_model(key: str) -> ModelTables:
+    """
+    Model stored under `key`, or None if it is gone.
+    """
+    return session_store.get(key)
+
+
+def session_model(key: str) -> tuple:
+    """
+    Key and model of the data a page shows, for the functions of
+    services.graph_cache. The model is a function loading it from the store,
+    called only if the graph of `key` is not cached.
+
+    If the model of `key` is gone, e.g. evicted or kept by another worker
+    with the memory backend, the key and model of the current data are
+    returned instead, and the page has to be reset to them.
+    """
+    if ("model", key) in graph_cache or key in session_store:
+
+        def load() -> ModelTables:
+            model = get_model(key)
+            if model is None:
+                raise KeyError(f"no stored model for session key {key}")
+            return model
+
+        return key, load
+
+    from services.data_provider import data_provider
+
+    data = data_provider.get()
+    return data["key"], data["model"]
@@ -0,0 +1,68 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from components.cytoscape import Elements
+
+ELEMENTS_JS = Path(__file__).resolve().parents[2] / "assets" / "elements.js"
+
+# loads the asset the way the browser does and applies the patch to the
+# element list with window.dash_clientside.elements.patch
+RUNNER = """
+global.window = {dash_clientside: {}};
+require(process.argv[1]);
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const patched = window.dash_clientside.elements.patch(input.elements, input.patch);
+process.stdout.write(JSON.stringify(patched));
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+def patch_js(elements, patch):
+    result = subprocess.run(
+        ["node", "-e", RUNNER, str(ELEMENTS_JS)],
+        input=json.dumps({"elements": elements, "patch": patch}),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def _node(id, parent):
+    return {"data": {"id": id, "label": id, "type": "measure", "parent": parent}, "classes": "measure"}
+
+
+def _edge(source, target):
+    return {"data": {"id": f"{source}->{target}", "source": source, "target": target}, "classes": "edge"}
+
+
+def test_js_patch_rebuilds_the_new_elements():
+    old = [_node("A", "t1"), _node("B", "t1"), _node("C", "t1"), _edge("A", "B"), _edge("B", "C")]
+    new = [_node("A", "t2"), _node("C", "t1"), _node("D", "t1"), _edge("A", "C"), _edge("C", "D")]
+
+    patched = patch_js(old, Elements.diff(old, new))
+
+    key = lambda elements: sorted(json.dumps(element, sort_keys=True) for element in elements)
+    assert key(patched) == key(new)
+    assert patch_js(old, {"elements": new}) == new
+
+
+def test_js_decodes_encoded_patches():
+    old = [_node("A", "t1"), _node("B", "t1"), _edge("A", "B")]
+    new = [
+        {**_node("A", None), "position": {"x": 0, "y": 50}},
+        _node("C", "t1"),
+        _edge("A", "C"),
+        {"data": {"id": "custom", "source": "C", "target": "A"}, "classes": "edge"},
+    ]
+    patch = Elements.diff(old, new)
+    encoded = {**patch, "add": Elements.encode(patch["add"]), "update": Elements.encode(patch["update"])}
+
+    key = lambda elements: sorted(json.dumps(element, sort_keys=True) for element in elements)
+    assert key(patch_js(old, encoded)) == key(new)
+    assert key(patch_js([], {"elements": Elements.encode(new)})) == key(new)
+    assert key(Elements.decode(Elements.encode(new))) == key(new)
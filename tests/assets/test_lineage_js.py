@@ -0,0 +1,46 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+from components.graph import Graph
+
+LINEAGE_JS = Path(__file__).resolve().parents[2] / "assets" / "lineage.js"
+
+# loads the asset the way the browser does and answers every query with
+# window.dash_clientside.lineage.traverse
+RUNNER = """
+global.window = {dash_clientside: {}};
+require(process.argv[1]);
+const input = JSON.parse(require("fs").readFileSync(0, "utf8"));
+const lineage = window.dash_clientside.lineage;
+const results = input.queries.map((ids) => lineage.traverse(input.adjacency, ids));
+process.stdout.write(JSON.stringify(results));
+"""
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+def traverse_js(adjacency, queries):
+    result = subprocess.run(
+        ["node", "-e", RUNNER, str(LINEAGE_JS)],
+        input=json.dumps({"adjacency": adjacency, "queries": queries}),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_js_traversal_matches_graph_lineage(seed, random_graph):
+    graph = Graph(*random_graph(60, 120, seed))
+    queries = [[node_id] for node_id in graph.nodes["id"]] + [["n3", "n17", "n42"], ["missing"]]
+
+    results = traverse_js(graph.adjacency(), queries)
+
+    for ids, result in zip(queries, results):
+        nodes, edges = graph.lineage(ids)
+        assert set(result["nodes"]) == nodes
+        assert set(result["edges"]) == {f"{u}->{v}" for u, v in edges}
@@ -0,0 +1,43 @@
+import pandas as pd
+from components.cluster_index import ClusterIndex
+from components.graph import Graph
+
+
+def test_members_by_label_and_id():
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B", "C", "D"],
+            "table": ["t1", "t2", "t1", "t3"],
+        }
+    )
+    clusters = {
+        "table": [
+            {"id": "t1", "label": "Sales", "type": "table", "parent": "d1"},
+            # same label in another dataset
+            {"id": "t2", "label": "Sales", "type": "table", "parent": "d2"},
+            {"id": "t3", "label": "Stock", "type": "table", "parent": "d1"},
+        ],
+        "page": [{"id": "p1", "label": "Overview", "type": "page", "parent": "r1"}],
+    }
+    index = ClusterIndex(nodes, clusters)
+
+    assert index.levels() == ["table"]
+    assert index.cluster_ids("table", ["Sales"]) == ["t1", "t2"]
+    assert index.rows("table", labels=["Sales"]).tolist() == [0, 1, 2]
+    assert index.rows("table", ids=["t3", "missing"]).tolist() == [3]
+    assert index.rows("page", labels=["Overview"]).tolist() == []
+    assert index.size("table", "t1") == 2
+
+
+def test_graph_index_follows_mutations():
+    nodes = pd.DataFrame({"id": ["A", "B"], "table": ["t1", "t1"]})
+    edges = pd.DataFrame({"source": ["A"], "target": ["B"]})
+    clusters = {"table": [{"id": "t1", "label": "Sales", "type": "table", "parent": "d1"}]}
+    graph = Graph(nodes, edges, clusters)
+
+    assert graph.cluster_members("table", labels=["Sales"]).tolist() == ["A", "B"]
+    assert graph.is_computed("cluster_index")
+
+    graph.add_nodes(pd.DataFrame({"id": ["C"], "table": ["t1"]}))
+
+    assert graph.cluster_members("table", ids=["t1"]).tolist() == ["A", "B", "C"]
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+from components.csr_graph import CSRGraph
+from components.graph import Graph
+from components.lineage import csr_adjacency, lineage
+
+
+@pytest.mark.parametrize("acyclic", [True, False])
+def test_csr_lineage_matches_networkx(acyclic, random_graph):
+    nodes, edges = random_graph(80, 200, 0, acyclic, repeated=True)
+    csr = CSRGraph.from_edges(edges["source"], edges["target"])
+    g = Graph(nodes, edges.copy()).g
+
+    assert csr.number_of_edges() == g.number_of_edges()
+    assert set(csr.to_networkx().edges) == set(g.edges)
+    for node_id in nodes["id"].tolist() + ["missing"]:
+        assert csr.lineage([node_id]) == lineage(g, [node_id])
+    assert csr.lineage(["n1", "n7", "n30"]) == lineage(g, ["n1", "n7", "n30"])
+
+
+def test_csr_adjacency_matches_networkx(random_graph):
+    nodes, edges = random_graph(40, 90, 1, repeated=True)
+    expected = csr_adjacency(Graph(nodes, edges.copy()).g)
+    adjacency = CSRGraph.from_edges(edges["source"], edges["target"]).adjacency()
+
+    def rows(adjacency, kind):
+        indptr, indices = adjacency[f"{kind}_indptr"], adjacency[f"{kind}_indices"]
+        return [sorted(indices[indptr[i]:indptr[i + 1]]) for i in range(len(adjacency["ids"]))]
+
+    # same numbering, neighbors may come in another order
+    assert adjacency["ids"] == expected["ids"]
+    for kind in ["out", "in"]:
+        assert rows(adjacency, kind) == rows(expected, kind)
+
+
+def test_graph_backends_agree(random_graph):
+    nodes, edges = random_graph(60, 150, 2, repeated=True)
+    nodes["table"] = [f"t{i % 4}" for i in range(60)]
+    graph = Graph(nodes.copy(), edges.copy(), lineage_index=True)
+    csr = Graph(nodes.copy(), edges.copy(), lineage_index=True, backend="csr")
+
+    assert csr.lineage_index is None
+    assert csr.roots == graph.roots and csr.leaves == graph.leaves
+    for node_id in nodes["id"]:
+        assert csr.lineage(node_id) == graph.lineage(node_id)
+
+    clusters = {"table": [{"id": f"t{i}", "label": f"t{i}", "type": "table", "parent": "d"} for i in range(4)]}
+    graph.clusters = csr.clusters = clusters
+    expected = graph.group({"measure": "table"}, copy=True)
+    grouped = csr.group({"measure": "table"}, copy=True)
+    assert grouped.backend == "csr"
+    assert grouped.export_records() == expected.export_records()
+    assert grouped.csr.lineage(["t0"]) == expected.lineage(["t0"])
+
+
+def test_csr_graph_mutations(random_graph):
+    nodes, edges = random_graph(30, 60, 3, repeated=True)
+    graph = Graph(nodes.copy(), edges.copy(), backend="csr")
+    reference = Graph(nodes.copy(), edges.copy())
+    for g in [graph, reference]:
+        g.roots, g.leaves
+        g.remove_edges(g.edges["id"].iloc[:10])
+        g.add_edges(pd.DataFrame({"source": ["n0", "n1"], "target": ["n29", "n28"]}))
+        g.remove_nodes(["n5"])
+
+    assert graph.roots == reference.roots and graph.leaves == reference.leaves
+    for node_id in graph.nodes["id"]:
+        assert graph.lineage(node_id) == reference.lineage(node_id)
@@ -95,3 +95,23 @@ def test_from_dataframe():
 # assert edges_dict[1]['data']['id'] == '2'
 # assert edges_dict[1]['data']['source'] == '2'
 # assert edges_dict[1]['data']['target'] == '3'
+
+
+def test_elements_diff():
+    old = [
+        {"data": {"id": "A", "label": "A", "type": "measure", "parent": "t1"}, "classes": "measure"},
+        {"data": {"id": "B", "label": "B", "type": "measure", "parent": "t1"}, "classes": "measure"},
+        {"data": {"id": "A->B", "source": "A", "target": "B"}, "classes": "edge"},
+    ]
+    new = [
+        {"data": {"id": "A", "label": "A", "type": "measure", "parent": "t2"}, "classes": "measure"},
+        {"data": {"id": "C", "label": "C", "type": "measure", "parent": "t2"}, "classes": "measure"},
+        {"data": {"id": "A->C", "source": "A", "target": "C"}, "classes": "edge"},
+    ]
+
+    patch = Elements.diff(old, new)
+
+    assert patch["remove"] == ["B", "A->B"]
+    assert patch["add"] == new[1:]
+    assert patch["update"] == new[:1]
+    assert Elements.diff(new, new) == {"remove": [], "add": [], "update": []}
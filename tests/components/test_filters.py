@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from components.filters import ClusterLabelIn, Isin
+from components.graph import Graph
+
+
+@pytest.fixture
+def graph():
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B", "C", "V1", "V2"],
+            "label": ["A", "B", "C", "V1", "V2"],
+            "type": ["measure", "measure", "measure", "visual", "visual"],
+            "parent": ["t1", "t1", "t2", "p1", "p1"],
+            "table": ["t1", "t1", "t2", None, None],
+            "page": [None, None, None, "p1", "p1"],
+            "workspace": ["w1", "w1", "w2", "w1", "w2"],
+            "location": ["d1", "d1", "d2", "r1", "r1"],
+        }
+    )
+    edges = pd.DataFrame({"source": ["A", "B", "C", "C"], "target": ["B", "V1", "V2", "X"]})
+    clusters = {
+        "table": [
+            {"id": "t1", "label": "Sales", "type": "table", "parent": "d1"},
+            {"id": "t2", "label": "Stock", "type": "table", "parent": "d2"},
+        ],
+        "page": [{"id": "p1", "label": "Overview", "type": "page", "parent": "r1"}],
+    }
+    return Graph(nodes, edges, clusters)
+
+
+def test_isin_and_cluster_label(graph):
+    selection = graph.select(Isin("type", ["measure"]) & ClusterLabelIn("table", ["Sales"]))
+
+    assert selection.node_ids.tolist() == ["A", "B"]
+    assert selection.edges["id"].tolist() == ["A->B"]
+
+
+def test_or_combines_levels(graph):
+    selection = graph.select(ClusterLabelIn("table", ["Stock"]) | ClusterLabelIn("page", ["Overview"]))
+
+    assert selection.node_ids.tolist() == ["C", "V1", "V2"]
+    # edges to nodes outside the selection, or without a node row, are left out
+    assert selection.edges["id"].tolist() == ["C->V2"]
+
+
+def test_workspace_and_unknown_values(graph):
+    assert graph.select(Isin("workspace", ["w2"])).node_ids.tolist() == ["C", "V2"]
+    assert not graph.select(Isin("type", ["missing"])).node_mask.any()
+    assert not graph.select(ClusterLabelIn("table", ["missing"])).edge_mask.any()
+
+
+def test_selection_does_not_copy_until_asked(graph):
+    selection = graph.select(Isin("type", ["visual"]))
+
+    assert isinstance(selection.node_mask, np.ndarray)
+    assert selection.nodes["id"].tolist() == ["V1", "V2"]
+    assert graph.categories("type") is graph.categories("type")
+
+
+def test_select_elements(graph):
+    elements = graph.select_elements(["measure"], ["d1"])
+
+    assert [element.data.id for element in elements.elements] == ["A", "B", "A->B"]
+
+
+def test_select_related_elements(graph):
+    related = graph.select_related_elements("table", ["Sales"], copy=True)
+
+    assert sorted(related.nodes["id"]) == ["A", "B", "V1"]
+    assert sorted(related.edges["id"]) == ["A->B", "B->V1"]
+
+
+def test_mutation_refreshes_filters(graph):
+    graph.select(Isin("type", ["visual"]))
+    graph.add_nodes(pd.DataFrame({"id": ["V3"], "label": ["V3"], "type": ["visual"], "parent": ["p1"]}))
+
+    assert graph.select(Isin("type", ["visual"])).node_ids.tolist() == ["V1", "V2", "V3"]
@@ -73,4 +73,129 @@ def test_group_by(sample_data):
     # assert new_graph is not None
     # assert "loc1" in new_graph.nodes["id"].values
     # assert "loc2" in new_graph.nodes["id"].values
-    pass
\ No newline at end of file
+    pass
+
+def test_group_measures_and_visuals(model):
+    graph = Graph.from_model(model)
+    grouped = graph.group({"measure": "table", "visual": "report"}, copy=True)
+
+    assert sorted(grouped.nodes["id"]) == ["r1", "t1", "t2"]
+    assert sorted(grouped.edges["id"]) == ["t1->r1", "t2->r1"]
+    assert "table" not in grouped.clusters and "page" not in grouped.clusters
+    # the source graph is left untouched
+    assert set(graph.clusters) == {"workspace", "dataset", "report", "table", "page"}
+
+
+def test_group_matches_sequential_group_by(model):
+    combined = Graph.from_model(model)
+    combined.group({"measure": "dataset", "visual": "page"})
+
+    sequential = Graph.from_model(model)
+    sequential.group_by("dataset", "measure")
+    sequential.group_by("page", "visual")
+
+    assert combined.export_elements() == sequential.export_elements()
+
+
+@pytest.mark.parametrize(
+    "groupings", [{}, {"measure": "table"}, {"measure": "dataset", "visual": "page"}]
+)
+def test_export_records_matches_export_elements(model, groupings):
+    import json
+
+    graph = Graph.from_model(model).group(groupings, copy=True)
+    expected = json.dumps(graph.export_elements().model_dump()["elements"])
+
+    assert json.dumps(graph.export_records()) == expected
+    assert json.dumps(graph.export_records(validate_sample=True)) == expected
+
+
+def _changed(model):
+    from components.nodes_model import Nodes
+
+    data = model.model_dump(exclude_none=True)
+    dataset, report = data["workspaces"][0]["children"]
+    # relabel A, move C to table 1, drop V3 and add V4
+    dataset["children"][0]["children"][0]["label"] = "A renamed"
+    dataset["children"][0]["children"].append(dataset["children"][1]["children"].pop())
+    dataset["children"][0]["children"][-1]["parent"] = "t1"
+    report["children"][1]["children"] = [{"id": "V4", "label": "V4", "type": "visual", "parent": "p2"}]
+    data["edges"] = [
+        edge for edge in data["edges"] if "V3" not in edge["id"]
+    ] + [{"id": "C->V4", "source": "C", "target": "V4"}, {"id": "A->C", "source": "A", "target": "C"}]
+    return Nodes(**data)
+
+
+def test_diff_finds_changed_nodes_and_edges(model):
+    graph = Graph.from_model(model)
+    diff = graph.diff(*Graph.tables_from_model(_changed(model)))
+
+    # node rows are keyed by id and parent, C moved from table 2 to table 1
+    assert diff.added_nodes["id"].tolist() == ["C", "V4"]
+    assert diff.removed_nodes == ["V3"]
+    assert diff.removed_placements.values.tolist() == [["C", "t2"]]
+    assert diff.updated_nodes["id"].tolist() == ["A"]
+    assert sorted(diff.added_edges["id"]) == ["A->C", "C->V4"]
+    assert sorted(diff.removed_edges["id"]) == ["A->V3", "C->V3"]
+    # clusters are compared by their own fields, membership is in the node rows
+    assert not diff.clusters_changed
+    assert graph.diff(*Graph.tables_from_model(model)).empty
+
+    renamed = _changed(model)
+    renamed.workspaces[0].children[0].children[0].label = "table one"
+    assert graph.diff(*Graph.tables_from_model(renamed)).clusters_changed
+
+
+def test_apply_diff_matches_a_fresh_build(model):
+    changed = _changed(model)
+    graph = Graph.from_model(model, lineage_index=True)
+    # computed before the diff, so they are patched rather than derived again
+    graph.roots, graph.leaves, graph.attributes, graph.lineage_index
+    graph.apply_diff(graph.diff(*Graph.tables_from_model(changed)))
+    fresh = Graph.from_model(changed, lineage_index=True)
+
+    def key(records):
+        return sorted(map(repr, records))
+
+    assert key(graph.export_records()) == key(fresh.export_records())
+    assert graph.roots == fresh.roots and graph.leaves == fresh.leaves
+    assert graph.attributes == fresh.attributes
+    assert set(graph.g.edges) == set(fresh.g.edges)
+    for node_id in fresh.g.nodes:
+        assert graph.lineage(node_id) == fresh.lineage(node_id)
+
+
+def test_mutations_update_degree_flags(model):
+    graph = Graph.from_model(model, lineage_index=True)
+    graph.roots, graph.leaves, graph.attributes
+
+    graph.add_nodes(
+        pd.DataFrame({"id": ["V9"], "label": ["V9"], "type": ["visual"], "parent": ["p2"], "page": ["p2"]})
+    )
+    graph.add_edges(pd.DataFrame({"source": ["V3"], "target": ["V9"]}))
+    assert "V3" not in graph.leaves and "V9" in graph.leaves
+    assert "V9" not in graph.roots
+    assert graph.attributes["V9"]["page"] == "p2"
+    assert graph.lineage("V9")[0] == {"A", "C", "V3", "V9"}
+
+    graph.remove_nodes(["V3"])
+    assert "V3" not in graph.g and "V9" not in graph.g
+    assert "V9" in graph.roots and "C" in graph.leaves
+    assert sorted(graph.edges["id"]) == ["A->B", "B->V1", "B->V2"]
+
+    graph.remove_edges(["A->B"])
+    assert "B" in graph.roots
+    assert graph.lineage("B") == ({"B", "V1", "V2"}, {("B", "V1"), ("B", "V2")})
+
+
+def test_derived_properties_are_lazy(model):
+    graph = Graph.from_model(model, lineage_index=True)
+    derived = ["roots", "leaves", "attributes", "lineage_index", "complete_paths", "colors"]
+    assert not any(graph.is_computed(name) for name in derived)
+
+    paths = graph.complete_paths
+    assert graph.complete_paths is paths
+    assert graph.is_computed("complete_paths") and not graph.is_computed("colors")
+
+    graph.group({"measure": "table"})
+    assert not graph.is_computed("complete_paths")
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from components.graph import Graph
+from components.graph_diff import GraphDiff
+from components.layered_layout import NODE_SEP, RANK_SEP, layered_positions, longest_path_ranks, place
+
+
+def _nodes(ids, parents=None):
+    return pd.DataFrame(
+        {"id": ids, "label": ids, "type": "measure", "parent": parents or [None] * len(ids)}
+    )
+
+
+def test_ranks_follow_the_longest_path():
+    # 0 -> 1 -> 2 and 0 -> 2, 3 alone
+    ranks = longest_path_ranks(4, np.array([0, 1, 0]), np.array([1, 2, 2]))
+
+    assert ranks.tolist() == [0, 1, 2, 0]
+
+
+def test_layers_are_spread_without_overlaps():
+    nodes = _nodes(["A", "B", "C", "D", "E"])
+    edges = pd.DataFrame({"source": ["A", "A", "A", "B", "X"], "target": ["B", "C", "D", "E", "A"]})
+
+    positions = layered_positions(nodes, edges)
+
+    assert positions["x"].to_dict() == {"A": 0, "B": RANK_SEP, "C": RANK_SEP, "D": RANK_SEP, "E": 2 * RANK_SEP}
+    layer = positions.loc[["B", "C", "D"], "y"].sort_values()
+    assert layer.tolist() == [-NODE_SEP, 0, NODE_SEP]
+
+
+def test_sweeps_untangle_crossings_and_keep_clusters_together():
+    # A feeds D and B feeds C, in the order given they would cross
+    nodes = _nodes(["A", "B", "C", "D", "E"], [None, None, "t1", "t2", "t1"])
+    edges = pd.DataFrame({"source": ["A", "B", "B"], "target": ["D", "C", "E"]})
+
+    y = layered_positions(nodes, edges)["y"]
+
+    assert (y["A"] < y["B"]) == (y["D"] < y["C"])
+    # C and E share a parent, D is not put between them
+    assert not min(y["C"], y["E"]) < y["D"] < max(y["C"], y["E"])
+
+
+def test_positions_are_exported_with_nodes():
+    graph = Graph(_nodes(["A", "B"]), pd.DataFrame({"source": ["A"], "target": ["B"]}))
+
+    records = graph.export_records(positions=graph.positions)
+
+    assert [record["position"] for record in records if "source" not in record["data"]] == [
+        {"x": 0.0, "y": 0.0},
+        {"x": float(RANK_SEP), "y": 0.0},
+    ]
+    assert "position" not in graph.export_records()[0]
+    assert graph.is_computed("positions")
+
+
+def test_place_keeps_known_positions_and_fills_free_slots():
+    fixed = pd.DataFrame({"x": [0.0, 100.0, 100.0], "y": [0.0, -25.0, 25.0]}, index=["A", "B", "C"])
+    edges = pd.DataFrame({"source": ["A", "B"], "target": ["N", "M"]})
+    seeds = pd.DataFrame({"x": [95.0], "y": [20.0]}, index=["K"])
+
+    positions = place(["A", "B", "C", "N", "M", "K"], edges, fixed, seeds)
+
+    assert positions.loc[["A", "B", "C"]].equals(fixed)
+    # after A, below B and C, M after B
+    assert positions.loc["N"].tolist() == [100.0, 100.0]
+    assert positions.loc["M"].tolist() == [200.0, -25.0]
+    # the seed is taken by C, K goes to the closest free slot
+    assert positions.loc["K"].tolist() == [100.0, -75.0]
+    layer = positions[positions["x"] == 100.0]["y"].sort_values()
+    assert (layer.diff().dropna() >= NODE_SEP).all()
+
+
+def test_views_and_reloads_keep_node_positions():
+    nodes = _nodes(["A", "B", "C", "D"], ["t1", "t1", "t2", "t2"]).assign(table=["t1", "t1", "t2", "t2"])
+    edges = pd.DataFrame({"source": ["A", "B", "C"], "target": ["B", "C", "D"]})
+    clusters = {"table": [{"id": "t1", "label": "t1", "type": "table", "parent": None}, {"id": "t2", "label": "t2", "type": "table", "parent": None}]}
+    graph = Graph(nodes, edges, clusters)
+    before = graph.positions.copy()
+
+    grouped = graph.group({"measure": "table"}, copy=True)
+    positions = graph.place(grouped)
+    assert positions.loc["t1", "x"] == round(before.loc[["A", "B"], "x"].mean() / RANK_SEP) * RANK_SEP
+
+    graph.apply_diff(
+        GraphDiff(
+            added_nodes=_nodes(["E"], ["t1"]).assign(table=["t1"]),
+            added_edges=pd.DataFrame({"source": ["A"], "target": ["E"], "id": ["A->E"]}),
+        )
+    )
+
+    assert graph.positions.loc[before.index].equals(before)
+    assert graph.positions.loc["E", "x"] == before.loc["A", "x"] + RANK_SEP
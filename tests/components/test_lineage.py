@@ -0,0 +1,113 @@
+import random
+
+import pandas as pd
+import pytest
+from components.graph import Graph
+
+
+def _paths_lineage(graph, node_id):
+    nodes, edges = set(), set()
+    for path in graph.mapping_node_to_path.get(node_id, []):
+        nodes.update(path)
+        edges.update(zip(path[:-1], path[1:]))
+    return nodes, edges
+
+
+@pytest.fixture
+def diamond():
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B", "C", "D", "E"],
+            "label": ["A", "B", "C", "D", "E"],
+            "type": ["measure", "measure", "measure", "visual", "visual"],
+            "parent": ["t", "t", "t", "p", "p"],
+        }
+    )
+    edges = pd.DataFrame(
+        {"source": ["A", "A", "B", "C", "B"], "target": ["B", "C", "D", "D", "E"]}
+    )
+    return Graph(nodes, edges)
+
+
+def test_lineage_diamond(diamond):
+    nodes, edges = diamond.lineage("B")
+    assert nodes == {"A", "B", "D", "E"}
+    assert edges == {("A", "B"), ("B", "D"), ("B", "E")}
+
+
+def test_lineage_multiple_nodes(diamond):
+    nodes, edges = diamond.lineage(["C", "E"])
+    assert nodes == {"A", "B", "C", "D", "E"}
+    assert ("B", "D") not in edges
+    assert edges == {("A", "C"), ("C", "D"), ("A", "B"), ("B", "E")}
+
+
+def test_lineage_unknown_node(diamond):
+    assert diamond.lineage("Z") == (set(), set())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lineage_matches_paths(seed, random_graph):
+    nodes, edges = random_graph(14, 22, seed)
+    graph = Graph(nodes, edges)
+
+    for node_id in nodes["id"]:
+        assert graph.lineage(node_id) == _paths_lineage(graph, node_id)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lineage_index_matches_traversal(seed, random_graph):
+    nodes, edges = random_graph(40, 90, seed)
+    graph = Graph(nodes, edges)
+    indexed = Graph(nodes.copy(), edges.copy(), lineage_index=True)
+    assert indexed.lineage_index is not None
+
+    for node_id in nodes["id"]:
+        assert indexed.lineage(node_id) == graph.lineage(node_id)
+    assert indexed.lineage(["n1", "n7", "n30"]) == graph.lineage(["n1", "n7", "n30"])
+
+
+def test_lineage_index_memory_bound(random_graph):
+    nodes, edges = random_graph(200, 1500, 0)
+    # a chain is the worst case, every node reaches every other one
+    chain = pd.DataFrame({"source": nodes["id"][:-1].to_numpy(), "target": nodes["id"][1:].to_numpy()})
+    for edges in [edges, chain]:
+        graph = Graph(nodes.copy(), edges, lineage_index=True)
+        num_nodes = len(graph.lineage_index)
+        assert graph.lineage_index.nbytes <= 3 * num_nodes * num_nodes / 16 + 2 * num_nodes
+    assert graph.lineage_index.nbytes > 3 * num_nodes * num_nodes / 16 - 2 * num_nodes
+
+
+def test_lineage_index_falls_back_when_too_large(diamond):
+    graph = Graph(diamond.nodes, diamond.edges, lineage_index=True, lineage_index_max_nodes=3)
+    assert graph.lineage_index is None
+    assert graph.lineage("B")[0] == {"A", "B", "D", "E"}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_lineage_index_follows_edits(seed, random_graph):
+    rng = random.Random(seed)
+    nodes, edges = random_graph(60, 150, seed)
+    graph = Graph(nodes.copy(), edges.copy(), lineage_index=True)
+
+    for _ in range(10):
+        graph.remove_edges(rng.sample(graph.edges["id"].tolist(), 5))
+        # forward edges only, so the graph stays acyclic
+        pairs = [sorted(rng.sample(range(60), 2)) for _ in range(5)]
+        graph.add_edges(pd.DataFrame([(f"n{i}", f"n{j}") for i, j in pairs], columns=["source", "target"]))
+
+    assert graph.lineage_index is not None
+    fresh = Graph(graph.nodes[nodes.columns].copy(), graph.edges[["source", "target"]].copy(), lineage_index=True)
+    for node_id in nodes["id"]:
+        assert graph.lineage(node_id) == fresh.lineage(node_id)
+        assert graph.lineage_index.upstream([node_id]) == fresh.lineage_index.upstream([node_id])
+        assert graph.lineage_index.downstream([node_id]) == fresh.lineage_index.downstream([node_id])
+
+
+def test_lineage_index_dropped_on_cycle(diamond):
+    graph = Graph(diamond.nodes, diamond.edges, lineage_index=True)
+    graph.add_edges(pd.DataFrame({"source": ["D"], "target": ["A"]}))
+
+    # C now reaches B through D -> A
+    assert graph.lineage_index is None
+    assert graph.lineage("B")[0] == {"A", "B", "C", "D", "E"}
@@ -0,0 +1,101 @@
+import pandas as pd
+from components.graph import Graph
+from components.node_table import parse_filter
+
+
+def _graph(**kwargs):
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B", "C", "D", "E"],
+            "label": ["Sales", "Margin", "Stock", "Overview", "Sales"],
+            "type": ["measure", "measure", "measure", "visual", "visual"],
+            "parent": ["t1", "t1", None, "p1", "p1"],
+        }
+    )
+    edges = pd.DataFrame({"source": ["A", "B", "D"], "target": ["B", "D", "E"]})
+    return Graph(nodes, edges, **kwargs)
+
+
+def test_parse_filter():
+    assert parse_filter('{label} contains "Sal" && {type} s= measure && {id} ige B && {id} is blank') == [
+        ("label", "contains", "Sal", None),
+        ("type", "=", "measure", True),
+        ("id", ">=", "B", False),
+        ("id", None, "blank", None),
+    ]
+    assert parse_filter("") == []
+
+
+def test_filters_follow_the_case_prefix():
+    table = _graph().node_table
+
+    def ids(filter_query):
+        return [row["id"] for row in table.page(0, 10, filter_query)[0]]
+
+    assert ids("{label} icontains SAL") == ["A", "E"]
+    assert ids("{label} scontains SAL") == []
+    assert ids("{label} scontains Sal") == ["A", "E"]
+    assert ids("{type} i= MEASURE") == ["A", "B", "C"]
+    assert ids("{type} s= MEASURE") == []
+    assert ids("{label} i> sales") == ["C"]
+    # unknown operators match no row instead of being ignored
+    assert ids("{label} sfoo Sales") == []
+
+
+def test_pages_are_filtered_and_sorted():
+    table = _graph().node_table
+    sort_by = [{"column_id": "type", "direction": "desc"}, {"column_id": "label", "direction": "asc"}]
+
+    data, page_count = table.page(0, 2, "", sort_by)
+
+    assert page_count == 3
+    assert [row["id"] for row in data] == ["D", "E"]
+    assert [row["id"] for row in table.page(2, 2, "", sort_by)[0]] == ["C"]
+    # pages past the end show the last one
+    assert [row["id"] for row in table.page(9, 2, "", sort_by)[0]] == ["C"]
+
+    data, page_count = table.page(0, 10, "{label} contains sal && {type} = measure")
+    assert page_count == 1
+    assert data == [{"id": "A", "label": "Sales", "type": "measure", "parent": "t1"}]
+    # missing values match no term, are sorted last and sent as null
+    assert [row["id"] for row in table.page(0, 10, "{parent} != t1")[0]] == ["D", "E"]
+    data, _ = table.page(0, 10, "", [{"column_id": "parent", "direction": "asc"}])
+    assert data[-1] == {"id": "C", "label": "Stock", "type": "measure", "parent": None}
+
+
+def test_dependencies_upstream_then_downstream():
+    for kwargs in [{}, {"lineage_index": True}, {"backend": "csr"}]:
+        table = _graph(**kwargs).node_table
+
+        data, page_count = table.dependency_page("B", 0, 10)
+
+        assert page_count == 1
+        assert [(row["direction"], row["id"]) for row in data] == [
+            ("upstream", "A"),
+            ("downstream", "D"),
+            ("downstream", "E"),
+        ]
+        sort_by = [{"column_id": "label", "direction": "desc"}]
+        assert [row["id"] for row in table.dependency_page("B", 1, 2, sort_by)[0]] == ["D"]
+        assert table.dependency_page("C", 0, 10) == ([], 1)
+
+
+def test_table_follows_mutations():
+    graph = _graph()
+    assert len(graph.node_table) == 5
+
+    graph.add_nodes(pd.DataFrame({"id": ["F"], "label": ["New"], "type": ["measure"], "parent": ["t1"]}))
+
+    assert "F" in graph.node_table
+    assert graph.node_table.page(0, 10, "{label} = New")[0][0]["id"] == "F"
+
+
+def test_sorted_dependencies_are_kept():
+    table = _graph().node_table
+    sort_by = [{"column_id": "label", "direction": "asc"}]
+
+    order = table.dependency_order("B", sort_by)
+
+    assert table.dependency_order("B", sort_by) is order
+    assert [row["id"] for row in table.dependency_page("B", 0, 2, sort_by)[0]] == ["D", "A"]
+    assert [row["id"] for row in table.dependency_page("B", 1, 2, sort_by)[0]] == ["E"]
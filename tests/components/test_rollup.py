@@ -0,0 +1,138 @@
+import pandas as pd
+import pytest
+from components.graph import Graph
+from components.rollup import combinations
+
+
+@pytest.fixture
+def graph():
+    # V2 is shown on two pages of two reports
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B", "V1", "V2", "V2"],
+            "label": ["A", "B", "V1", "V2", "V2"],
+            "type": ["measure", "measure", "visual", "visual", "visual"],
+            "parent": ["t1", "t2", "p1", "p1", "p2"],
+            "table": ["t1", "t2", None, None, None],
+            "page": [None, None, "p1", "p1", "p2"],
+            "dataset": ["d1", "d1", None, None, None],
+            "report": [None, None, "r1", "r1", "r2"],
+        }
+    )
+    edges = pd.DataFrame({"source": ["A", "B", "B", "X"], "target": ["B", "V1", "V2", "A"]})
+    clusters = {
+        "dataset": [{"id": "d1", "label": "dataset", "type": "dataset", "parent": "w1"}],
+        "table": [
+            {"id": "t1", "label": "table 1", "type": "table", "parent": "d1"},
+            {"id": "t2", "label": "table 2", "type": "table", "parent": "d1"},
+        ],
+        "report": [
+            {"id": "r1", "label": "report 1", "type": "report", "parent": "w1"},
+            {"id": "r2", "label": "report 2", "type": "report", "parent": "w1"},
+        ],
+        "page": [
+            {"id": "p1", "label": "page 1", "type": "page", "parent": "r1"},
+            {"id": "p2", "label": "page 2", "type": "page", "parent": "r2"},
+        ],
+    }
+    return Graph(nodes, edges, clusters)
+
+
+def test_combinations_cover_the_filter_pane():
+    assert len(combinations()) == 9
+    assert {} in combinations()
+    assert {"measure": "dataset", "visual": "page"} in combinations()
+
+
+def test_same_node_under_two_parents_stays_in_both_groups(graph):
+    grouped = graph.group({"measure": "table", "visual": "page"}, copy=True)
+
+    assert grouped.nodes["id"].tolist() == ["t1", "t2", "p1", "p2"]
+    assert grouped.nodes.set_index("id").loc["p2", "parent"] == "r2"
+    assert grouped.edges["id"].tolist() == ["t1->t2", "t2->p1", "t2->p2", "X->t1"]
+    assert set(grouped.clusters) == {"dataset", "report"}
+
+
+def test_nodes_under_two_parents_get_an_id_per_parent(graph):
+    view = graph.rollup.view({})
+
+    assert view.nodes["id"].tolist() == ["A", "B", "V1", "V2@p1", "V2@p2"]
+    assert view.nodes["label"].tolist() == ["A", "B", "V1", "V2", "V2"]
+    assert view.edges["id"].tolist() == ["A->B", "B->V1", "B->V2@p1", "B->V2@p2", "X->A"]
+    assert len({element["data"]["id"] for element in view.export_records()}) == len(view.export_records())
+
+    # still qualified when the other type is grouped, gone once V2 is grouped
+    grouped = graph.rollup.view({"measure": "table"})
+    assert grouped.nodes.set_index("id").loc[["V2@p1", "V2@p2"], "parent"].tolist() == ["p1", "p2"]
+    assert "V2" not in graph.rollup.view({"visual": "page"}).nodes["id"].tolist()
+
+    single = Graph(graph.nodes.iloc[:4], graph.edges, graph.clusters)
+    assert single.rollup.view({}) is single
+
+
+def test_views_are_precomputed_and_reused(graph):
+    graph.rollup.precompute()
+
+    assert len(graph.rollup.views()) == 9
+    view = graph.rollup.view({"visual": "report", "measure": "dataset"})
+    assert graph.rollup.view({"measure": "dataset", "visual": "report"}) is view
+    assert view.edges["id"].tolist() == ["d1->r1", "d1->r2", "X->d1"]
+
+
+def test_mutations_drop_the_views(graph):
+    graph.rollup.precompute()
+    graph.remove_edges(["B->V2"])
+
+    assert not graph.is_computed("rollup")
+    assert graph.rollup.view({"visual": "page"}).edges["id"].tolist() == ["A->B", "B->p1", "X->A"]
+
+
+def test_unknown_level_raises(graph):
+    with pytest.raises(KeyError):
+        graph.group({"measure": "workspace"}, copy=True)
+
+
+def test_fit_picks_the_finest_grouping_within_budget(graph):
+    assert graph.rollup.fit(100) == {}
+    assert graph.rollup.fit(graph.num_elements - 1) == {"measure": "table", "visual": "page"}
+    assert graph.rollup.fit(1) == {"measure": "dataset", "visual": "report"}
+    # never finer than asked for
+    assert graph.rollup.fit(100, {"measure": "dataset"}) == {"measure": "dataset"}
+
+
+def test_views_over_budget_keep_their_heaviest_edges(graph):
+    coarsest = graph.rollup.view(graph.rollup.fit(1))
+    assert coarsest.num_elements == 6
+    assert coarsest.edges.set_index("id")["weight"].to_dict() == {"d1->r1": 2, "d1->r2": 1, "X->d1": 1}
+
+    capped = graph.rollup.capped(coarsest, 4)
+    assert capped.num_elements == 4
+    assert capped.nodes["id"].tolist() == ["d1", "r1", "r2"]
+    assert capped.edges["id"].tolist() == ["d1->r1"]
+
+    # the nodes alone are over budget, the ones with the heaviest edges stay
+    capped = graph.rollup.capped(coarsest, 2)
+    assert capped.nodes["id"].tolist() == ["d1", "r1"]
+    assert capped.edges.empty
+
+
+def test_expanded_clusters_show_their_children(graph):
+    groupings = {"measure": "dataset", "visual": "report"}
+    view = graph.rollup.detail(groupings, ["d1"])
+
+    assert view.nodes["id"].tolist() == ["t1", "t2", "r1", "r2"]
+    assert view.nodes.set_index("id").loc["t1", "parent"] == "d1"
+    assert [item["id"] for item in view.clusters["dataset"]] == ["d1"]
+    assert "table" not in view.clusters
+
+    view = graph.rollup.detail(groupings, ["d1", "t2", "r2"])
+
+    assert view.nodes["id"].tolist() == ["t1", "B", "r1", "p2"]
+    assert view.edges["id"].tolist() == ["t1->B", "B->r1", "B->p2", "X->t1"]
+    assert graph.rollup.detail(groupings, []) is graph.rollup.view(groupings)
+
+
+def test_descendants_and_clusters(graph):
+    assert graph.rollup.descendants("d1") == {"t1", "t2"}
+    assert graph.rollup.is_cluster("p2")
+    assert not graph.rollup.is_cluster("V2")
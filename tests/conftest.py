@@ -0,0 +1,98 @@
+import random
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def random_graph():
+    """
+    Builds the node and edge frames of a random graph over the ids n0, n1,
+    ... Edges go from lower to higher ids unless `acyclic` is False. There
+    are `num_edges` distinct pairs, sorted, or with `repeated` as many
+    pairs drawn in turn, repeats included.
+    """
+
+    def build(num_nodes, num_edges, seed, acyclic=True, repeated=False):
+        rng = random.Random(seed)
+        ids = [f"n{i}" for i in range(num_nodes)]
+
+        def pair():
+            i, j = rng.sample(range(num_nodes), 2)
+            if acyclic:
+                i, j = sorted((i, j))
+            return ids[i], ids[j]
+
+        if repeated:
+            pairs = [pair() for _ in range(num_edges)]
+        else:
+            pairs = set()
+            while len(pairs) < num_edges:
+                pairs.add(pair())
+            pairs = sorted(pairs)
+        nodes = pd.DataFrame({"id": ids, "label": ids, "type": "measure", "parent": None})
+        return nodes, pd.DataFrame(pairs, columns=["source", "target"])
+
+    return build
+
+
+@pytest.fixture
+def model():
+    """
+    Nodes model of one workspace: a dataset of two tables with measures A,
+    B and C, and a report of two pages with visuals V1, V2 and V3.
+    """
+    from components.nodes_model import Nodes
+
+    return Nodes(
+        workspaces=[
+            {
+                "id": "w1", "label": "w1", "type": "workspace",
+                "children": [
+                    {
+                        "id": "d1", "label": "dataset", "type": "dataset", "parent": "w1",
+                        "children": [
+                            {
+                                "id": "t1", "label": "table 1", "type": "table", "parent": "d1",
+                                "children": [
+                                    {"id": "A", "label": "A", "type": "measure", "parent": "t1"},
+                                    {"id": "B", "label": "B", "type": "measure", "parent": "t1"},
+                                ],
+                            },
+                            {
+                                "id": "t2", "label": "table 2", "type": "table", "parent": "d1",
+                                "children": [
+                                    {"id": "C", "label": "C", "type": "measure", "parent": "t2"},
+                                ],
+                            },
+                        ],
+                    },
+                    {
+                        "id": "r1", "label": "report", "type": "report", "parent": "w1",
+                        "children": [
+                            {
+                                "id": "p1", "label": "page 1", "type": "page", "parent": "r1",
+                                "children": [
+                                    {"id": "V1", "label": "V1", "type": "visual", "parent": "p1"},
+                                    {"id": "V2", "label": "V2", "type": "visual", "parent": "p1"},
+                                ],
+                            },
+                            {
+                                "id": "p2", "label": "page 2", "type": "page", "parent": "r1",
+                                "children": [
+                                    {"id": "V3", "label": "V3", "type": "visual", "parent": "p2"},
+                                ],
+                            },
+                        ],
+                    },
+                ],
+            }
+        ],
+        edges=[
+            {"id": "A->B", "source": "A", "target": "B"},
+            {"id": "B->V1", "source": "B", "target": "V1"},
+            {"id": "B->V2", "source": "B", "target": "V2"},
+            {"id": "C->V3", "source": "C", "target": "V3"},
+            {"id": "A->V3", "source": "A", "target": "V3"},
+        ],
+    )
@@ -0,0 +1,37 @@
+import gzip
+import json
+
+from flask import Flask, jsonify
+from services import compression
+
+
+def _client():
+    server = Flask(__name__)
+
+    @server.route("/big")
+    def big():
+        return jsonify({"elements": [{"data": {"id": str(i)}} for i in range(1000)]})
+
+    @server.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    return compression.compress_responses(server).test_client()
+
+
+def test_large_json_is_gzipped(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    response = _client().get("/big", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(json.loads(gzip.decompress(response.data))["elements"]) == 1000
+
+
+def test_small_or_unaccepted_responses_are_left_alone():
+    client = _client()
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/big")
+    assert "Content-Encoding" not in response.headers
+    assert len(response.json["elements"]) == 1000
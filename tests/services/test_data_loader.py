@@ -0,0 +1,122 @@
+import os
+
+import pandas as pd
+import pytest
+from components.graph import Graph
+from services import data_loader
+from services.data_loader import load_data, tables_from_rows
+from services.model_cache import ModelCache
+
+
+@pytest.fixture(autouse=True)
+def model_cache(tmp_path, monkeypatch):
+    cache = ModelCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(data_loader, "model_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def csv_paths(tmp_path):
+    nodes = pd.DataFrame(
+        {
+            "id": ["001", "002", "003", "004", "005", "006"],
+            "label": ["m1", "m2", "m3", "v1", "v2", "v3"],
+            "node_type": ["measure", "measure", "measure", "visual", "visual", "visual"],
+            "source": ["t1", "t1", "t2", "p1", "p2", "p1"],
+            "source_label": ["table 1", "table 1", "table 2", "page 1", "page 2", "page 1"],
+            "location": ["d1", "d1", "d1", "r1", "r2", "r1"],
+            "location_label": ["dataset", "dataset", "dataset", "report 1", "report 2", "report 1"],
+            "workspace": ["w2", "w2", "w2", "w1", "w1", "w1"],
+            "workspace_label": ["ws 2", "ws 2", "ws 2", "ws 1", "ws 1", "ws 1"],
+        }
+    )
+    edges = pd.DataFrame({"source": ["001", "002", "003"], "target": ["002", "004", "005"]})
+    nodes_path, edges_path = tmp_path / "nodes.csv", tmp_path / "edges.csv"
+    nodes.to_csv(nodes_path, index=False)
+    edges.to_csv(edges_path, index=False)
+    return str(nodes_path), str(edges_path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 4])
+def test_chunked_load_matches_single_chunk(csv_paths, chunksize):
+    expected = load_data(*csv_paths)
+    loaded = load_data(*csv_paths, chunksize=chunksize)
+
+    assert loaded["model"].model == expected["model"].model
+    assert loaded["model"].key == expected["model"].key
+    assert loaded["types"] == ["measure", "visual"]
+    assert loaded["tables"] == ["table 1", "table 2"]
+    assert loaded["stats"]["node_rows"] == 6
+    assert loaded["stats"]["edge_rows"] == 3
+
+
+def test_load_keeps_ids_as_strings(csv_paths):
+    model = load_data(*csv_paths)["model"].model
+    assert model.edges[0].id == "001->002"
+    # workspaces are ordered by id
+    assert [workspace.id for workspace in model.workspaces] == ["w1", "w2"]
+
+
+def test_tables_from_rows(csv_paths):
+    nodes, clusters = tables_from_rows(pd.read_csv(csv_paths[0], dtype=str))
+    # workspaces are ordered by id, their children by their first row
+    assert clusters["id"].tolist() == ["w1", "r1", "p1", "r2", "p2", "w2", "d1", "t1", "t2"]
+    assert nodes.loc[nodes["page"] == "p1", "id"].tolist() == ["004", "006"]
+    assert nodes.loc[nodes["id"] == "005", ["report", "workspace"]].values.tolist() == [["r2", "w1"]]
+
+
+@pytest.mark.skipif(not ModelCache().enabled, reason="pyarrow is not installed")
+def test_warm_load_matches_cold_load(csv_paths):
+    cold = load_data(*csv_paths)
+    warm = load_data(*csv_paths)
+
+    assert not cold["stats"]["cached"]
+    assert warm["stats"]["cached"]
+    assert warm["model"].key == cold["model"].key
+    assert warm["model"].model == cold["model"].model
+    assert warm["model"].model.model_dump() == cold["model"].model.model_dump()
+    # graphs are built from the tables as they would be from the model
+    for built, expected in zip(warm["model"].graph_tables(), Graph.tables_from_model(cold["model"].model)):
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(built, expected)
+        else:
+            assert built == expected
+    assert warm["types"] == cold["types"]
+    assert warm["tables"] == cold["tables"]
+
+
+@pytest.mark.skipif(not ModelCache().enabled, reason="pyarrow is not installed")
+def test_cache_is_keyed_by_content(csv_paths):
+    nodes_path, edges_path = csv_paths
+    key = load_data(*csv_paths)["model"].key
+
+    # a new modification time alone keeps the cache and the key
+    stat = os.stat(edges_path)
+    os.utime(edges_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    touched = load_data(*csv_paths)
+    assert touched["stats"]["cached"]
+    assert touched["model"].key == key
+
+    with open(edges_path, "a") as f:
+        f.write("004,006\n")
+    reloaded = load_data(*csv_paths)
+    assert not reloaded["stats"]["cached"]
+    assert reloaded["model"].key != key
+    assert reloaded["model"].model.edges[-1].id == "004->006"
+
+
+@pytest.mark.skipif(not ModelCache().enabled, reason="pyarrow is not installed")
+def test_tables_saved_while_loading_are_not_used(csv_paths, model_cache, monkeypatch):
+    load_data(*csv_paths)
+    assert not [name for name in os.listdir(model_cache.cache_dir) if name.endswith(".tmp")]
+
+    # another process saves other tables between the freshness check and the read
+    fresh_manifest = model_cache._fresh_manifest
+
+    def save_meanwhile(sources):
+        manifest = fresh_manifest(sources)
+        model_cache._write_manifest({**manifest, "metadata": {**manifest["metadata"], "key": "other"}})
+        return manifest
+
+    monkeypatch.setattr(model_cache, "_fresh_manifest", save_meanwhile)
+    assert model_cache.load(list(csv_paths)) == (None, None)
@@ -0,0 +1,111 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+from services import data_provider as provider_module
+from services.data_provider import DataProvider
+
+
+@pytest.fixture
+def sources(tmp_path):
+    nodes = pd.DataFrame(
+        {
+            "id": ["A", "B"],
+            "label": ["A", "B"],
+            "node_type": ["measure", "visual"],
+            "source": ["t1", "p1"],
+            "source_label": ["table 1", "page 1"],
+            "location": ["d1", "r1"],
+            "location_label": ["dataset", "report"],
+            "workspace": ["w1", "w1"],
+            "workspace_label": ["ws", "ws"],
+        }
+    )
+    nodes_path, edges_path = tmp_path / "nodes.csv", tmp_path / "edges.csv"
+    nodes.to_csv(nodes_path, index=False)
+    pd.DataFrame({"source": ["A"], "target": ["B"]}).to_csv(edges_path, index=False)
+    return str(nodes_path), str(edges_path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    load_data = provider_module.load_data
+
+    def counting_load_data(*args, **kwargs):
+        calls.append(args)
+        return load_data(*args, use_cache=False)
+
+    monkeypatch.setattr(provider_module, "load_data", counting_load_data)
+    return calls
+
+
+def _touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_loads_once(sources, calls):
+    provider = DataProvider(*sources)
+    data = provider.get()
+
+    assert provider.get() is data
+    assert len(calls) == 1
+    assert data["tables"] == ["table 1"]
+    assert data["key"]
+
+
+def test_reload_only_when_sources_change(sources, calls):
+    provider = DataProvider(*sources)
+    data = provider.get()
+
+    assert not provider.reload()
+    assert provider.get() is data
+
+    with open(sources[1], "a") as f:
+        f.write("B,A\n")
+    _touch(sources[1])
+
+    assert provider.reload()
+    assert provider.version == 2
+    assert len(provider.get()["model"].edges) == 2
+    assert len(calls) == 2
+    # versions follow the source files, pages only move to newer ones
+    assert provider.get()["version"] > data["version"]
+    assert provider.version_of(provider.get()["key"]) == provider.get()["version"]
+    assert provider.version_of(data["key"]) == 0
+
+
+def test_watcher_swaps_in_new_data(sources, calls):
+    provider = DataProvider(*sources)
+    provider.get()
+    provider.start_watching(interval=0.01)
+    try:
+        _touch(sources[0])
+        deadline = time.time() + 5
+        while provider.version < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        provider.stop_watching()
+
+    assert provider.version == 2
+
+
+def test_reload_updates_the_cached_graph(sources, calls):
+    from services import graph_cache
+
+    provider = DataProvider(*sources)
+    data = provider.get()
+    graph = graph_cache.graph_from_model(data["model"], data["key"])
+
+    with open(sources[1], "a") as f:
+        f.write("B,A\n")
+    _touch(sources[1])
+    provider.reload()
+
+    data = provider.get()
+    updated = graph_cache.graph_from_model(data["model"], data["key"])
+    assert sorted(updated.edges["id"]) == ["A->B", "B->A"]
+    assert not updated.leaves
+    assert sorted(graph.edges["id"]) == ["A->B"]
@@ -0,0 +1,180 @@
+import pandas as pd
+from components.cytoscape import Elements
+from components.graph import Graph
+from services import graph_cache
+from services.graph_cache import GraphCache, fingerprint
+
+
+def _graph():
+    nodes = pd.DataFrame({"id": ["A", "B"], "label": ["A", "B"], "type": ["measure", "measure"], "parent": [None, None]})
+    edges = pd.DataFrame({"source": ["A"], "target": ["B"]})
+    return Graph(nodes, edges)
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_get_or_build_reuses_entries():
+    cache = GraphCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return _graph()
+
+    first = cache.get_or_build("key", build)
+    assert cache.get_or_build("key", build) is first
+    assert len(calls) == 1
+
+
+def test_lru_eviction_respects_budget():
+    cache = GraphCache(max_bytes=1)
+    cache.get_or_build("a", _graph)
+    cache.get_or_build("b", _graph)
+    assert "a" not in cache
+    assert "b" in cache
+    assert len(cache) == 1
+
+
+def test_views_are_cached_and_do_not_modify_base(model):
+    graph_cache.graph_cache.clear()
+    base = graph_cache.graph_from_model(model)
+    view = graph_cache.graph_view(model, ["table 1"], {"measure": "dataset"})
+
+    assert graph_cache.graph_view(model, ["table 1"], {"measure": "dataset"}) is view
+    assert graph_cache.graph_from_model(model) is base
+    assert sorted(view.nodes["id"]) == ["V1", "V2", "V3", "d1"]
+    assert sorted(base.nodes["id"]) == ["A", "B", "C", "V1", "V2", "V3"]
+
+
+def test_update_graph_moves_the_cached_graph(model):
+    graph_cache.graph_cache.clear()
+    base = graph_cache.graph_from_model(model, key="old")
+
+    changed = model.model_copy(update={"edges": model.edges[:1]})
+    diff = graph_cache.update_graph("old", "new", changed)
+
+    assert sorted(diff.removed_edges["id"]) == ["A->V3", "B->V1", "B->V2", "C->V3"]
+    assert ("model", "old") not in graph_cache.graph_cache
+    updated = graph_cache.graph_from_model(changed, key="new")
+    # the lineage index is patched, the grouped views are left to first use
+    assert updated.is_computed("lineage_index") and not updated.is_computed("rollup")
+    assert sorted(updated.edges["id"]) == ["A->B"]
+    assert updated.lineage("A")[0] == {"A", "B"}
+    # the old graph is left as it was for the requests still holding it
+    assert sorted(base.edges["id"]) == ["A->B", "A->V3", "B->V1", "B->V2", "C->V3"]
+    assert base.lineage("A")[0] == {"A", "B", "V1", "V2", "V3"}
+    assert base.g.has_edge("B", "V1")
+    assert graph_cache.update_graph("missing", "other", changed) is None
+
+
+def test_updated_graph_matches_a_fresh_build_with_shared_nodes(model):
+    from components.nodes_model import Nodes
+    from components.rollup import combinations
+
+    graph_cache.graph_cache.clear()
+    graph_cache.graph_from_model(model, key="old")
+
+    # V1 is added to a third page, and then relabelled on its first one
+    changed = model.model_dump(exclude_none=True)
+    report = changed["workspaces"][0]["children"][1]
+    report["children"].append(
+        {
+            "id": "p3", "label": "page 3", "type": "page", "parent": "r1",
+            "children": [{"id": "V1", "label": "V1", "type": "visual", "parent": "p3"}],
+        }
+    )
+    graph_cache.update_graph("old", "new", Nodes(**changed))
+    report["children"][0]["children"][0]["label"] = "V1 renamed"
+    graph_cache.update_graph("new", "newer", Nodes(**changed))
+
+    updated = graph_cache.graph_from_model(changed, key="newer")
+    fresh = Graph(*Graph.tables_from_model(Nodes(**changed)))
+    for groupings in combinations():
+        view, expected = updated.rollup.view(groupings), fresh.rollup.view(groupings)
+        assert sorted(view.nodes["id"]) == sorted(expected.nodes["id"])
+        assert sorted(view.edges["id"]) == sorted(expected.edges["id"])
+    assert sorted(updated.rollup.view({}).nodes["id"]) == ["A", "B", "C", "V1@p1", "V1@p3", "V2", "V3"]
+    assert sorted(updated.nodes["label"]) == ["A", "B", "C", "V1", "V1 renamed", "V2", "V3"]
+
+
+def test_groupings_are_looked_up_on_the_base_graph(model):
+    graph_cache.graph_cache.clear()
+    base = graph_cache.graph_from_model(model)
+    entries = len(graph_cache.graph_cache)
+
+    view = graph_cache.graph_view(model, None, {"measure": "table", "visual": "page"})
+
+    assert view is base.rollup.view({"measure": "table", "visual": "page"})
+    assert len(graph_cache.graph_cache) == entries
+    assert sorted(view.nodes["id"]) == ["p1", "p2", "t1", "t2"]
+
+
+def test_views_fit_the_element_budget(model):
+    graph_cache.graph_cache.clear()
+
+    assert graph_cache.fit_groupings(model, budget=0, groupings={"measure": "table"}) == {"measure": "table"}
+    groupings = graph_cache.fit_groupings(model, budget=5)
+    assert groupings == {"measure": "dataset", "visual": "report"}
+    # the coarsest grouping when nothing fits, measures and visuals stay apart
+    coarsest = graph_cache.graph_view(model, None, graph_cache.fit_groupings(model, budget=1))
+    assert sorted(coarsest.nodes["id"]) == ["d1", "r1"]
+    assert coarsest.edges["id"].tolist() == ["d1->r1"]
+
+    view = graph_cache.graph_view(model, None, groupings, expanded=["d1"])
+    assert graph_cache.graph_view(model, None, groupings, expanded=["d1"]) is view
+    assert sorted(view.nodes["id"]) == ["r1", "t1", "t2"]
+
+
+def test_views_are_cut_down_when_nothing_fits(monkeypatch, model):
+    graph_cache.graph_cache.clear()
+    monkeypatch.setattr(graph_cache, "ELEMENT_BUDGET", 3)
+
+    groupings = graph_cache.fit_groupings(model, budget=3)
+    assert groupings == {"measure": "dataset", "visual": "report"}
+    # the workspace cluster and both nodes, the edge is over budget
+    elements = graph_cache.view_elements(model, None, groupings)
+    assert len(elements) == 3
+    assert sorted(element["data"]["id"] for element in elements) == ["d1", "r1", "w1"]
+
+
+def test_view_patch_sends_only_the_changes(model):
+    graph_cache.graph_cache.clear()
+    view = {"dataset": "k", "table": None, "groupings": {}, "expanded": []}
+    grouped = {**view, "groupings": {"measure": "table"}}
+
+    patch = graph_cache.view_patch(model, view, model, grouped)
+
+    assert sorted(patch["remove"]) == ["A", "A->B", "A->V3", "B", "B->V1", "B->V2", "C", "C->V3"]
+    assert [element["data"]["id"] for element in Elements.decode(patch["add"])] == ["t1->V1", "t1->V2", "t2->V3", "t1->V3"]
+    # the table clusters are now drawn as nodes
+    assert [element["data"]["id"] for element in Elements.decode(patch["update"])] == ["t1", "t2"]
+    assert graph_cache.view_patch(model, view, model, grouped) is patch
+    assert Elements.decode(graph_cache.view_patch(None, None, model, grouped)["elements"]) == graph_cache.view_elements(
+        model, None, {"measure": "table"}, key="k"
+    )
+
+
+def test_models_are_loaded_only_for_uncached_graphs(monkeypatch, model):
+    from services import session_store
+    from services.data_provider import data_provider
+
+    graph_cache.graph_cache.clear()
+    key = session_store.put_model(model)
+    loads = []
+    get = session_store.session_store.get
+    monkeypatch.setattr(session_store.session_store, "get", lambda key: loads.append(key) or get(key))
+
+    dataset_key, load = session_store.session_model(key)
+    graph = graph_cache.graph_view(load, None, {"measure": "table"}, key=dataset_key)
+    assert dataset_key == key and loads == [key]
+
+    # cached graphs are served without reading the store
+    assert graph_cache.graph_view(session_store.session_model(key)[1], None, {"measure": "table"}, key=key) is graph
+    assert loads == [key]
+
+    # a key whose model is gone is replaced by the current data
+    monkeypatch.setattr(data_provider, "get", lambda: {"key": "current", "model": model})
+    assert session_store.session_model("missing") == ("current", model)
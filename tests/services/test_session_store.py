@@ -0,0 +1,75 @@
+import pytest
+from components.nodes_model import Nodes
+from services import session_store
+from services.session_store import MemoryStore, SqliteStore, create_store
+
+
+@pytest.fixture
+def model():
+    return Nodes(
+        workspaces=[{"id": "w1", "label": "w1", "type": "workspace", "children": []}],
+        edges=[{"id": "A->B", "source": "A", "target": "B"}],
+    )
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_items=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert store.get("a") == 1
+    assert store.get("b") is None
+    assert "c" in store
+
+
+def test_stores_are_bounded_by_bytes(tmp_path):
+    import pickle
+
+    from services.model_cache import ModelTables
+
+    def tables(key):
+        return ModelTables({"id": [key] * 1000}, {}, {}, key=key)
+
+    # memory is estimated from the tables, sqlite counts the pickled values
+    memory = MemoryStore(max_bytes=2 * tables("a").nbytes)
+    sqlite = SqliteStore(str(tmp_path / "store.sqlite"), max_bytes=2 * len(pickle.dumps(tables("a"))))
+    for store in [memory, sqlite]:
+        for key in ["a", "b", "c"]:
+            store.set(key, tables(key))
+        assert "a" not in store
+        assert store.get("c").key == "c"
+
+        # the last value is kept even if it is over budget on its own
+        store.max_bytes = 1
+        store.set("d", tables("d"))
+        assert "b" not in store and "c" not in store
+        assert store.get("d").key == "d"
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, model):
+    path = str(tmp_path / "store.sqlite")
+    SqliteStore(path).set("key", model)
+    assert SqliteStore(path).get("key") == model
+    assert SqliteStore(path).get("missing") is None
+
+
+def test_sqlite_store_bounds_items(tmp_path):
+    store = SqliteStore(str(tmp_path / "store.sqlite"), max_items=2)
+    for key in ["a", "b", "c"]:
+        store.set(key, key)
+    assert "a" not in store
+    assert store.get("c") == "c"
+
+
+def test_create_store_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        create_store("redis")
+
+
+def test_put_model_returns_content_key(model):
+    key = session_store.put_model(model)
+    assert session_store.put_model(model.model_copy()) == key
+    assert session_store.get_model(key) == model
+    assert session_store.get_model("missing") is None
+